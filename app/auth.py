@@ -6,9 +6,11 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from pymongo.errors import ExecutionTimeout, NetworkTimeout
 from app.config import settings
 from app.database import users_collection
 from app.models.user import User, TokenData
+from app.singleflight import single_flight
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,6 +31,9 @@ def get_password_hash(password: str) -> str:
 
 async def get_user(email: str) -> Optional[User]:
     """Get user by email (without password)."""
+    return await single_flight.do(("user", email), lambda: _load_user(email))
+
+async def _load_user(email: str) -> Optional[User]:
     try:
         # Exclude password field when fetching user
         user = await users_collection.find_one(
@@ -41,8 +46,11 @@ async def get_user(email: str) -> Optional[User]:
                 user["id"] = str(user["_id"])
             return User(**user)
         return None
+    except (ExecutionTimeout, NetworkTimeout):
+        # Out of deadline is a 504, not a missing user
+        raise
     except Exception as e:
-        logger.error(f"Error getting user {email}: {str(e)}")
+        logger.error("Error getting user %s: %s", email, e)
         return None
 
 async def authenticate_user(email: str, password: str):
@@ -51,11 +59,11 @@ async def authenticate_user(email: str, password: str):
         # Get user WITH password for authentication only
         user_with_password = await users_collection.find_one({"email": email})
         if not user_with_password:
-            logger.warning(f"User not found: {email}")
+            logger.warning("User not found: %s", email)
             return False
         
         if not verify_password(password, user_with_password["password"]):
-            logger.warning(f"Invalid password for user: {email}")
+            logger.warning("Invalid password for user: %s", email)
             return False
         
         # Return user WITHOUT password
@@ -64,8 +72,10 @@ async def authenticate_user(email: str, password: str):
             user_dict["id"] = str(user_dict["_id"])
         
         return User(**user_dict)
+    except (ExecutionTimeout, NetworkTimeout):
+        raise
     except Exception as e:
-        logger.error(f"Authentication error for {email}: {str(e)}")
+        logger.error("Authentication error for %s: %s", email, e)
         return False
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -94,7 +104,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError as e:
-        logger.error(f"JWT decode error: {str(e)}")
+        logger.error("JWT decode error: %s", e)
         raise credentials_exception
     
     if token_data.email is None:
@@ -102,7 +112,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     
     user = await get_user(email=token_data.email)
     if user is None:
-        logger.error(f"User not found for token: {token_data.email}")
+        logger.error("User not found for token: %s", token_data.email)
         raise credentials_exception
     
     return user
\ No newline at end of file
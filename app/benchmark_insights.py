@@ -0,0 +1,57 @@
+# benchmark_insights.py
+"""
+Compare validation cost of typed insights against the old untyped dicts
+Run: python -m app.benchmark_insights [sessions] [insights_per_session]
+"""
+
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from app.models.session import SessionUpdate
+
+class LegacySessionUpdate(BaseModel):
+    """SessionUpdate as it was before insights were typed"""
+    insights: Optional[List[Dict[str, Any]]] = None
+    insight_counts: Optional[Dict[str, int]] = None
+
+def make_payload(count: int) -> Dict[str, Any]:
+    start = datetime(2024, 1, 1, 10, 0, 0)
+    types = ["technique", "musicality", "memory", "tempo"]
+    insights = [
+        {
+            "type": types[i % len(types)],
+            "timestamp": (start + timedelta(seconds=i * 7)).isoformat(),
+            "text": f"Bar {i}: keep the left hand lighter under the melody",
+        }
+        for i in range(count)
+    ]
+    counts: Dict[str, int] = {}
+    for insight in insights:
+        counts[insight["type"]] = counts.get(insight["type"], 0) + 1
+    return {"insights": insights, "insight_counts": counts}
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    per_session = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    payload = make_payload(per_session)
+    repeat = 5
+
+    print("📊 Insight validation benchmark")
+    print(f"   {sessions} updates x {per_session} insights, best of {repeat}")
+    print("-" * 50)
+
+    results = {}
+    for name, model in [("dict[str, Any]", LegacySessionUpdate), ("Insight", SessionUpdate)]:
+        timer = timeit.Timer(lambda: model.model_validate(payload))
+        best = min(timer.repeat(repeat=repeat, number=sessions))
+        results[name] = best
+        per_update = best / sessions * 1e6
+        print(f"   {name:<16} {best:8.3f}s total  {per_update:8.1f}µs/update")
+
+    legacy, typed = results["dict[str, Any]"], results["Insight"]
+    print(f"\n   Typed / untyped: {typed / legacy:.2f}x")
+
+if __name__ == "__main__":
+    main()
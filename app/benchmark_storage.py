@@ -0,0 +1,76 @@
+# benchmark_storage.py
+"""
+Compare storage engines on the operations the API uses most
+Run: python -m app.benchmark_storage [engines...]   (default: memory sqlite)
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from app.config import settings
+from app.storage import create_engine
+
+USERS = 20
+SESSIONS_PER_USER = 100
+COLLECTION = "benchmark_session"
+
+async def timed(label: str, count: int, func):
+    start = time.perf_counter()
+    for i in range(count):
+        await func(i)
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<28} {elapsed * 1000 / count:8.3f} ms/op")
+
+async def run(name: str):
+    engine = create_engine(name)
+    sessions = engine.collection(COLLECTION)
+    await sessions.delete_many({})
+    await sessions.create_index([("user_id", 1), ("start_time", -1)])
+
+    print(f"\n🗄️  {name}")
+    start_time = datetime(2024, 1, 1)
+    ids = []
+
+    async def insert(i):
+        result = await sessions.insert_one({
+            "user_id": f"user{i % USERS}",
+            "start_time": start_time + timedelta(minutes=i),
+            "is_active": False,
+            "insights": [],
+            "insight_counts": {},
+        })
+        ids.append(result.inserted_id)
+
+    async def find_by_id(i):
+        await sessions.find_one({"_id": ids[i % len(ids)], "user_id": f"user{i % USERS}"})
+
+    async def list_recent(i):
+        await sessions.find({"user_id": f"user{i % USERS}"}).sort("start_time", -1).limit(20).to_list(20)
+
+    async def append_insight(i):
+        await sessions.update_one(
+            {"_id": ids[i % len(ids)]},
+            {"$push": {"insights": {"type": "tech", "text": "bench"}}, "$inc": {"insight_counts.tech": 1}}
+        )
+
+    await timed("insert_one", USERS * SESSIONS_PER_USER, insert)
+    await timed("find_one by _id", 1000, find_by_id)
+    await timed("recent 20 for user", 1000, list_recent)
+    await timed("update_one $push/$inc", 1000, append_insight)
+
+    await sessions.delete_many({})
+    await engine.close()
+
+async def main():
+    engines = sys.argv[1:] or ["memory", "sqlite"]
+    with tempfile.TemporaryDirectory() as directory:
+        settings.SQLITE_PATH = os.path.join(directory, "benchmark.db")
+        print(f"📊 Storage benchmark: {USERS} users x {SESSIONS_PER_USER} sessions")
+        for name in engines:
+            await run(name)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+# app/cache.py
+"""
+Per-user read-through cache for rarely changing collections.
+
+List reads go through `catalog_cache.get_or_load`, and every write calls
+`catalog_cache.invalidate` for the user it touched. Invalidation bumps a
+per-user generation number that is part of every key, so all cached pages for
+that user go stale at once without a key scan.
+
+The backend comes from CACHE_BACKEND:
+- "memory": a size-bounded LRU inside this process (default, and the stand-in
+  used when no cache server is around)
+- "redis": a shared cache server, for deployments with several workers
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.config import settings
+
+class CacheBackend:
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: int):
+        raise NotImplementedError
+
+    async def get_generation(self, key: str) -> int:
+        raise NotImplementedError
+
+    async def bump_generation(self, key: str):
+        raise NotImplementedError
+
+class MemoryCache(CacheBackend):
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Kept apart from the LRU: evicting a generation would resurrect stale entries
+        self._generations: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_generation(self, key: str) -> int:
+        return self._generations.get(key, 0)
+
+    async def bump_generation(self, key: str):
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+class RedisCache(CacheBackend):
+    """Shared cache. Size bounds come from the server's maxmemory policy (use volatile-lru)."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # only needed when this backend is selected
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._redis.get(key)
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: int):
+        await self._redis.set(key, json.dumps(value), ex=ttl)
+
+    async def get_generation(self, key: str) -> int:
+        value = await self._redis.get(key)
+        return int(value) if value is not None else 0
+
+    async def bump_generation(self, key: str):
+        await self._redis.incr(key)
+
+class ReadThroughCache:
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get_or_load(
+        self, namespace: str, user_id: str, params: str, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached value, or load, cache and return it. Values must be JSON-compatible."""
+        generation = await self.backend.get_generation(f"gen:{namespace}:{user_id}")
+        key = f"{namespace}:{user_id}:{generation}:{params}"
+        value = await self.backend.get(key)
+        if value is None:
+            value = await loader()
+            await self.backend.set(key, value, self.ttl)
+        return value
+
+    async def invalidate(self, namespace: str, user_id: str):
+        await self.backend.bump_generation(f"gen:{namespace}:{user_id}")
+
+def create_cache() -> ReadThroughCache:
+    if settings.CACHE_BACKEND == "redis":
+        backend: CacheBackend = RedisCache(settings.CACHE_URL)
+    else:
+        backend = MemoryCache(settings.CACHE_MAX_ENTRIES)
+    return ReadThroughCache(backend, settings.CACHE_TTL_SECONDS)
+
+catalog_cache = create_cache()
@@ -0,0 +1,161 @@
+# app/compression.py
+"""
+Negotiated gzip/Brotli response compression.
+
+CompressionMiddleware compresses complete (non-streaming) text and JSON
+responses above COMPRESSION_MIN_SIZE. Brotli is preferred when the client
+accepts it and the optional `brotli` package is installed.
+
+For payloads that no longer change, such as finished sessions, routes can
+keep the compressed bytes in `precompressed` so repeated downloads skip the
+database, serialization and compression entirely.
+"""
+
+import gzip
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; fall back to gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+
+def choose_encoding(accept_encoding: str) -> str:
+    """Pick the best encoding the client accepts: "br", "gzip" or "identity"."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    def allowed(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return "identity"
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_LEVEL)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+    return body
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)  # streaming responses go out as they are
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+class PrecompressedCache:
+    """
+    Size-bounded LRU of serialized payloads and their compressed variants.
+
+    Every invalidation bumps `generation`. Readers take the generation before
+    loading and pass it to `store`, which skips caching if anything was
+    invalidated in between, so a fill cannot outlive a concurrent write.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, Dict[str, bytes]]" = OrderedDict()
+
+    def response(self, request: Request, key: Hashable) -> Optional[Response]:
+        """Build a response from the cache, compressing lazily per encoding."""
+        variants = self._entries.get(key)
+        if variants is None:
+            return None
+        self._entries.move_to_end(key)
+        return self._respond(request, variants)
+
+    def store(self, request: Request, key: Hashable, body: bytes, generation: int) -> Response:
+        """Cache a payload loaded at `generation` and respond with it."""
+        variants = {"identity": body}
+        if generation == self.generation:
+            self._entries[key] = variants
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self._respond(request, variants)
+
+    def invalidate(self, key: Hashable):
+        self.generation += 1
+        self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: tuple):
+        """Drop every entry whose tuple key starts with prefix."""
+        self.generation += 1
+        for key in [k for k in self._entries if isinstance(k, tuple) and k[:len(prefix)] == prefix]:
+            del self._entries[key]
+
+    def _respond(self, request: Request, variants: Dict[str, bytes]) -> Response:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding not in variants:
+            variants[encoding] = compress(variants["identity"], encoding)
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=variants[encoding], media_type="application/json", headers=headers)
+
+precompressed = PrecompressedCache(settings.PRECOMPRESSED_CACHE_MAX_ENTRIES)
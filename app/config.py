@@ -1,10 +1,14 @@
 # app/config.py
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
+    # Storage engine: mongo | memory | sqlite
+    STORAGE_ENGINE: str = "mongo"
+    SQLITE_PATH: str = "stretto_notes.db"
+
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "stretto_notes_test"
@@ -14,12 +18,53 @@ class Settings(BaseSettings):
     SESSION_COLLECTION: str = "session"
     PRACTICE_COLLECTION: str = "practice"
     JOURNEY_COLLECTION: str = "journey"
+    JOB_COLLECTION: str = "job"
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Background jobs
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: int = 60
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: int = 5
+
+    # Live session events: "auto" uses change streams when MongoDB is a replica set
+    SESSION_EVENTS_BACKEND: str = "auto"  # auto | mongo | memory
+    SESSION_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+
+    # Merge rapid updates to active sessions and write them once per window
+    SESSION_WRITE_BEHIND: bool = False
+    SESSION_WRITE_BEHIND_WINDOW_MS: int = 500
+
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_LEVEL: int = 5
+    PRECOMPRESSED_CACHE_MAX_ENTRIES: int = 256
+
+    # Read-through cache for practice items and journeys
+    CACHE_BACKEND: str = "memory"  # memory | redis
+    CACHE_URL: str = "redis://localhost:6379/0"
+    CACHE_MAX_ENTRIES: int = 1024
+    CACHE_TTL_SECONDS: int = 300
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_INFO_SAMPLE_RATE: float = 1.0  # fraction of INFO/DEBUG records kept
+
+    # Request deadlines (ms), also sent to MongoDB as maxTimeMS
+    REQUEST_DEADLINE_MS: int = 10000
+    REQUEST_DEADLINE_MAX_MS: int = 30000  # cap for the X-Request-Deadline-Ms header
+    # Route defaults by path regex; 0 disables the deadline
+    ROUTE_DEADLINES_MS: Dict[str, int] = {
+        r"/sessions/[^/]+/events": 0,  # long-lived event stream
+        r"/dashboard/?": 5000,
+    }
+
     # CORS
     ALLOWED_ORIGINS: List[str] = ["*"]  # Configure properly in production
     
@@ -2,11 +2,21 @@
 """
 Command-line script to create users for StrettoNotes API
 Usage: python create_user.py
+       python create_user.py --import users.csv [--report report.csv] [--workers N]
+
+Batch files are CSV with an email,password,full_name,is_admin header, or JSONL
+with the same keys. Passwords are hashed in parallel and every row gets a line
+in the report: created, exists, duplicate, invalid or error.
 """
 
+import argparse
 import asyncio
+import csv
 import getpass
+import json
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorClient
 from passlib.context import CryptContext
 import os
@@ -124,6 +134,169 @@ async def list_users():
     finally:
         client.close()
 
+def hash_password(password: str) -> str:
+    """Module-level so worker processes can run it"""
+    return pwd_context.hash(password)
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    """Read user rows from a CSV or JSONL file"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+def field_text(value: Any) -> str:
+    """A row value as text; JSONL rows may hold numbers or null"""
+    return "" if value is None else str(value)
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y")
+
+def write_report(path: str, results: List[Dict[str, Any]]):
+    """Write one result per input row, as CSV or JSONL depending on the extension"""
+    fields = ["row", "email", "status", "id", "error"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for result in results:
+                f.write(json.dumps({k: result.get(k) for k in fields}) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for result in results:
+                writer.writerow({k: result.get(k) for k in fields})
+
+def print_progress(label: str, done: int, total: int):
+    print(f"\r   {label}: {done}/{total}", end="\n" if done == total else "", flush=True)
+
+async def import_users(path: str, report_path: Optional[str] = None, workers: Optional[int] = None,
+                       batch_size: int = 500):
+    """Create users in bulk from a file"""
+
+    # Import settings and models for consistent configuration
+    from pydantic import ValidationError
+    from pymongo.errors import BulkWriteError
+    from app.config import settings
+    from app.models.user import UserCreate
+    from app.storage import create_engine
+
+    print("🎵 StrettoNotes Batch User Import")
+    print("-" * 40)
+
+    results: List[Dict[str, Any]] = []
+    valid: List[Dict[str, Any]] = []
+    seen = set()
+    engine = create_engine()
+    users_collection = engine.collection(settings.USER_COLLECTION)
+
+    try:
+        rows = read_rows(path)
+
+        # Validate rows and drop duplicates within the file
+        for number, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                results.append({"row": number, "email": "", "status": "invalid", "error": "Row is not an object"})
+                continue
+            result = {"row": number, "email": field_text(row.get("email")).strip()}
+            results.append(result)
+            try:
+                user = UserCreate(
+                    email=result["email"],
+                    password=field_text(row.get("password")),
+                    full_name=field_text(row.get("full_name")).strip() or None
+                )
+            except ValidationError as e:
+                result.update(status="invalid", error=str(e.errors()[0]["msg"]))
+                continue
+            if len(user.password) < 6:
+                result.update(status="invalid", error="Password must be at least 6 characters")
+                continue
+            # Same comparison as the unique email index and login: exact match
+            if user.email in seen:
+                result.update(status="duplicate", error="Email appears earlier in the file")
+                continue
+            seen.add(user.email)
+            result["email"] = user.email
+            valid.append({"result": result, "user": user, "is_admin": parse_bool(row.get("is_admin"))})
+
+        print(f"Read {len(rows)} rows, {len(valid)} valid\n")
+
+        # One query finds every email that is already registered
+        emails = [entry["user"].email for entry in valid]
+        existing = set()
+        for start in range(0, len(emails), batch_size):
+            found = await users_collection.find(
+                {"email": {"$in": emails[start:start + batch_size]}}, {"email": 1}
+            ).to_list(None)
+            existing.update(user["email"] for user in found)
+
+        pending = []
+        for entry in valid:
+            if entry["user"].email in existing:
+                entry["result"].update(status="exists", error="User already exists")
+            else:
+                pending.append(entry)
+
+        # bcrypt is CPU bound, so hash across processes
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [loop.run_in_executor(pool, hash_password, entry["user"].password) for entry in pending]
+            for done, future in enumerate(asyncio.as_completed(futures), start=1):
+                await future
+                print_progress("Hashing passwords", done, len(futures))
+            hashes = [future.result() for future in futures]
+
+        # Unordered inserts keep going past rows that fail
+        inserted = 0
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            documents = [
+                {
+                    "email": entry["user"].email,
+                    "password": hashes[start + i],
+                    "full_name": entry["user"].full_name,
+                    "is_admin": entry["is_admin"],
+                    "created_at": datetime.utcnow()
+                }
+                for i, entry in enumerate(batch)
+            ]
+            failed = {}
+            try:
+                await users_collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+            for i, (entry, document) in enumerate(zip(batch, documents)):
+                error = failed.get(i)
+                if error is None:
+                    entry["result"].update(status="created", id=str(document["_id"]))
+                    inserted += 1
+                elif error.get("code") == 11000:
+                    entry["result"].update(status="exists", error="User already exists")
+                else:
+                    entry["result"].update(status="error", error=error.get("errmsg"))
+            print_progress("Creating users", min(start + batch_size, len(pending)), len(pending))
+
+        counts: Dict[str, int] = {}
+        for result in results:
+            status = result.get("status", "error")
+            counts[status] = counts.get(status, 0) + 1
+        print(f"\n✅ Created {inserted} users")
+        for status, count in sorted(counts.items()):
+            print(f"   {status}: {count}")
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        for result in results:
+            if "status" not in result:
+                result.update(status="error", error=f"Import aborted: {e}")
+    finally:
+        await engine.close()
+        # Written even if the import stopped part way, so created rows are never lost track of
+        if report_path:
+            write_report(report_path, results)
+            print(f"\n📄 Report written to {report_path}")
+
 async def main():
     """Main menu"""
     
@@ -144,4 +317,13 @@ async def main():
         print("Invalid option")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="StrettoNotes user management")
+    parser.add_argument("--import", dest="import_path", help="CSV or JSONL file of users to create")
+    parser.add_argument("--report", help="Write a per-row result report (CSV, or JSONL by extension)")
+    parser.add_argument("--workers", type=int, default=None, help="Password hashing processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.import_path:
+        asyncio.run(import_users(args.import_path, args.report, args.workers))
+    else:
+        asyncio.run(main())
\ No newline at end of file
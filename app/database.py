@@ -1,18 +1,58 @@
 # app/database.py
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
 from app.config import settings
+from app.storage import create_engine
 from bson import ObjectId
+from typing import Any, Dict, List, Optional
+import logging
 
-# MongoDB client
-client = AsyncIOMotorClient(settings.MONGODB_URL)
-db = client[settings.DATABASE_NAME]
+logger = logging.getLogger(__name__)
+
+# Storage engine (MongoDB unless STORAGE_ENGINE says otherwise)
+engine = create_engine()
 
 # Collections
-users_collection = db[settings.USER_COLLECTION]
-sessions_collection = db[settings.SESSION_COLLECTION]
-practice_collection = db[settings.PRACTICE_COLLECTION]
-journeys_collection = db[settings.JOURNEY_COLLECTION]
+users_collection = engine.collection(settings.USER_COLLECTION)
+sessions_collection = engine.collection(settings.SESSION_COLLECTION)
+practice_collection = engine.collection(settings.PRACTICE_COLLECTION)
+journeys_collection = engine.collection(settings.JOURNEY_COLLECTION)
+jobs_collection = engine.collection(settings.JOB_COLLECTION)
+
+async def ensure_indexes():
+    """Create the indexes the routers' queries rely on. Safe to run on every start."""
+    indexes = [
+        (sessions_collection, [("user_id", ASCENDING), ("start_time", DESCENDING)], {}),
+        (sessions_collection, [("user_id", ASCENDING), ("subject_id", ASCENDING), ("start_time", DESCENDING)], {}),
+        (sessions_collection, [("user_id", ASCENDING), ("is_active", ASCENDING), ("start_time", DESCENDING)], {}),
+        # Only live sessions are in here, so GET /sessions/active and the dashboard's
+        # active session touch nothing else and need no in-memory sort
+        (sessions_collection, [("user_id", ASCENDING), ("start_time", DESCENDING)], {
+            "name": "active_sessions_by_start",
+            "partialFilterExpression": {"is_active": True},
+        }),
+        (practice_collection, [("user_id", ASCENDING)], {}),
+        (journeys_collection, [("user_id", ASCENDING), ("updated_at", DESCENDING)], {}),
+        # Also stops a concurrent register or import from creating the same user twice
+        (users_collection, [("email", ASCENDING)], {"unique": True}),
+        # Claim query of the job worker
+        (jobs_collection, [("status", ASCENDING), ("available_at", ASCENDING)], {}),
+    ]
+    for collection, keys, options in indexes:
+        try:
+            await collection.create_index(keys, **options)
+        except Exception as e:
+            logger.error("Could not create index %s on %s: %s", keys, collection.name, e)
+
+async def find_by_ids(collection, ids: List[str], user_id: str) -> List[Optional[Dict[str, Any]]]:
+    """Fetch a user's documents by (valid) ids with a single $in query, in the order requested."""
+    unique_ids = list(dict.fromkeys(ids))
+    documents = await collection.find({
+        "_id": {"$in": [ObjectId(i) for i in unique_ids]},
+        "user_id": user_id
+    }).to_list(len(unique_ids))
+    by_id = {str(d["_id"]): d for d in documents}
+    return [by_id.get(i) for i in ids]
 
 # Helper class for ObjectId handling
 class PyObjectId(ObjectId):
@@ -0,0 +1,106 @@
+# app/deadline.py
+"""
+Per-request deadlines and cancellation on client disconnect.
+
+Every request runs with a deadline: the X-Request-Deadline-Ms header if the
+client sent one (capped at REQUEST_DEADLINE_MAX_MS), otherwise the route's
+default from ROUTE_DEADLINES_MS, otherwise REQUEST_DEADLINE_MS. Routes whose
+default is 0 (long-lived streams) never get a deadline, whatever the header
+says. The handler
+runs inside pymongo.timeout(), so every find, update and aggregate it issues
+carries a maxTimeMS for the time that is left, and MongoDB stops the work
+when the deadline passes. The handler is also cancelled when the deadline
+expires or the client disconnects, so it stops holding a pool connection.
+"""
+
+import asyncio
+import contextlib
+import json
+import re
+import pymongo
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+DEADLINE_HEADER = "x-request-deadline-ms"
+
+_route_deadlines = [(re.compile(pattern), ms) for pattern, ms in settings.ROUTE_DEADLINES_MS.items()]
+
+def request_deadline_ms(scope: Scope) -> int:
+    """Deadline for a request in ms; 0 means none."""
+    route_ms = next(
+        (ms for pattern, ms in _route_deadlines if pattern.fullmatch(scope["path"])), None
+    )
+    if route_ms == 0:
+        return 0
+    header = Headers(scope=scope).get(DEADLINE_HEADER)
+    if header and header.isdigit() and int(header) > 0:
+        return min(int(header), settings.REQUEST_DEADLINE_MAX_MS)
+    return settings.REQUEST_DEADLINE_MS if route_ms is None else route_ms
+
+class DeadlineMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline_ms = request_deadline_ms(scope)
+        messages: "asyncio.Queue[Message]" = asyncio.Queue()
+        response_started = False
+        response_complete = False
+
+        async def tracking_send(message: Message):
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        async def run_app():
+            timeout = pymongo.timeout(deadline_ms / 1000) if deadline_ms else contextlib.nullcontext()
+            with timeout:
+                await self.app(scope, messages.get, tracking_send)
+
+        handler = asyncio.create_task(run_app())
+
+        # We are the only reader of `receive`, so a disconnect is noticed even
+        # while the handler is busy and not reading the request
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if not response_complete:
+                        handler.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            done, _ = await asyncio.wait({handler}, timeout=deadline_ms / 1000 if deadline_ms else None)
+            if not done:
+                handler.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await handler
+                if not response_started:
+                    await _send_timeout(send)
+                return
+            with contextlib.suppress(asyncio.CancelledError):
+                # Cancelled because the client left: nobody to answer
+                await handler
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
+
+async def _send_timeout(send: Send):
+    body = json.dumps({"detail": "Request deadline exceeded"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 504,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
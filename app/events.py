@@ -0,0 +1,260 @@
+# app/events.py
+"""
+Live session change feed and server-sent event encoding.
+
+Changes are described with MongoDB's `updatedFields` shape (field path ->
+new value), whichever backend produced them:
+
+- MongoChangeFeed tails a single change stream on the sessions collection and
+  fans it out to the subscribed sessions in process. It needs a replica set
+  and sees writes from every worker.
+- InProcessChangeFeed is a pub/sub fed by the sessions router. It works on a
+  standalone server but only sees writes made by this process.
+"""
+
+import asyncio
+import contextvars
+import copy
+import json
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+from bson import ObjectId
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.database import engine, sessions_collection
+from app.storage.query import set_path
+
+logger = logging.getLogger(__name__)
+
+# A change is ("update", updated_fields), ("delete", None) or ("closed", None)
+Change = Tuple[str, Optional[Dict[str, Any]]]
+
+LIST_FIELDS = ("insights", "ai_suggestions")
+
+class Subscription:
+    """Queue of changes for one session, drained by one SSE stream."""
+
+    def __init__(self, maxsize: int = 100):
+        self.queue: "asyncio.Queue[Change]" = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, change: Change):
+        # A slow reader loses the oldest change rather than stalling writers.
+        # List fields are diffed against what was already sent, so the next
+        # full-list update still delivers anything that was dropped.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(change)
+
+    async def get(self, timeout: float) -> Optional[Change]:
+        """Wait for the next change. Returns None on timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        pass
+
+class ChangeFeed:
+    async def publish(self, session_id: str, change: Change):
+        raise NotImplementedError
+
+    async def subscribe(self, session_id: str) -> Subscription:
+        raise NotImplementedError
+
+class InProcessChangeFeed(ChangeFeed):
+    def __init__(self):
+        self._subscribers: Dict[str, Set["_InProcessSubscription"]] = {}
+
+    async def publish(self, session_id: str, change: Change):
+        self._dispatch(session_id, change)
+
+    async def subscribe(self, session_id: str) -> Subscription:
+        subscription = _InProcessSubscription(self, session_id)
+        self._subscribers.setdefault(session_id, set()).add(subscription)
+        return subscription
+
+    def _remove(self, subscription: "_InProcessSubscription"):
+        subscribers = self._subscribers.get(subscription.session_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.session_id]
+
+    def _dispatch(self, session_id: str, change: Change):
+        for subscription in self._subscribers.get(session_id, ()):
+            subscription.put(change)
+
+class _InProcessSubscription(Subscription):
+    def __init__(self, feed: InProcessChangeFeed, session_id: str):
+        super().__init__()
+        self.feed = feed
+        self.session_id = session_id
+
+    async def close(self):
+        self.feed._remove(self)
+
+class MongoChangeFeed(InProcessChangeFeed):
+    """
+    One change stream for all subscribers.
+
+    Each open stream holds an executor thread in Motor, so a stream per SSE
+    client would exhaust the pool. The stream is opened with the first
+    subscriber and closed when the last one leaves.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    async def publish(self, session_id: str, change: Change):
+        # The change stream already sees every write
+        pass
+
+    async def subscribe(self, session_id: str) -> Subscription:
+        subscription = await super().subscribe(session_id)
+        if self._task is None or self._task.done():
+            self._ready = asyncio.Event()
+            # Fresh context: the stream outlives the request that opened it
+            self._task = asyncio.create_task(self._pump(self._ready), context=contextvars.Context())
+        await self._ready.wait()
+        return subscription
+
+    def _remove(self, subscription: "_InProcessSubscription"):
+        super()._remove(subscription)
+        if not self._subscribers and self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _pump(self, ready: asyncio.Event):
+        pipeline = [{"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}}]
+        try:
+            async with sessions_collection.watch(pipeline) as stream:
+                ready.set()
+                async for event in stream:
+                    session_id = str(event["documentKey"]["_id"])
+                    if session_id not in self._subscribers:
+                        continue
+                    operation = event["operationType"]
+                    if operation == "delete":
+                        self._dispatch(session_id, ("delete", None))
+                    elif operation == "replace":
+                        document = dict(event["fullDocument"])
+                        document.pop("_id", None)
+                        self._dispatch(session_id, ("update", document))
+                    else:
+                        self._dispatch(session_id, ("update", event["updateDescription"]["updatedFields"]))
+        except Exception as e:
+            logger.error("Sessions change stream failed: %s", e)
+            # Clients reconnect, and the next subscriber opens a new stream
+            for session_id in list(self._subscribers):
+                self._dispatch(session_id, ("closed", None))
+        finally:
+            ready.set()
+
+change_feed: ChangeFeed = InProcessChangeFeed()
+
+async def configure_change_feed():
+    """Pick the change feed backend from settings, probing for change stream support on "auto"."""
+    global change_feed
+    backend = settings.SESSION_EVENTS_BACKEND
+    if backend == "auto":
+        try:
+            backend = "mongo" if await engine.supports_change_streams() else "memory"
+        except Exception as e:
+            logger.warning("Could not probe storage for change streams, using in-process events: %s", e)
+            backend = "memory"
+    change_feed = MongoChangeFeed() if backend == "mongo" else InProcessChangeFeed()
+    logger.info("Session events backend: %s", backend)
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def session_deltas(updated_fields: Dict[str, Any], sent: Dict[str, list]) -> list:
+    """
+    Turn an updatedFields document into SSE events.
+
+    List fields are sent as {"offset", "items"}: clients keep their list up to
+    `offset` and append `items`. `sent` holds a copy of each list as the client
+    has it and is advanced in place, so appends send only the new items while
+    edits and removals resend from the first item that changed.
+    """
+    lists: Dict[str, list] = {}
+    counts: Dict[str, Any] = {}
+    fields: Dict[str, Any] = {}
+    events = []
+
+    for path, value in updated_fields.items():
+        head, _, rest = path.partition(".")
+        if head in LIST_FIELDS:
+            current = lists.setdefault(head, list(sent[head]))
+            index, _, subpath = rest.partition(".")
+            if not rest:
+                current[:] = value or []
+            elif index.isdigit() and int(index) <= len(current):
+                if subpath:
+                    item = copy.deepcopy(current[int(index)])
+                    set_path(item, subpath, value)
+                    value = item
+                if int(index) == len(current):
+                    current.append(value)
+                else:
+                    current[int(index)] = value
+            else:
+                fields[path] = value
+        elif head == "insight_counts":
+            if rest:
+                counts[rest] = value
+            else:
+                counts.update(value or {})
+        else:
+            fields[path] = value
+
+    for name, current in lists.items():
+        previous = sent[name]
+        offset = next(
+            (i for i, (old, new) in enumerate(zip(previous, current)) if old != new),
+            min(len(previous), len(current))
+        )
+        if offset == len(previous) == len(current):
+            continue
+        events.append(_sse(name, {"offset": offset, "items": current[offset:]}))
+        sent[name] = current
+    if counts:
+        events.append(_sse("insight_counts", counts))
+    if fields:
+        events.append(_sse("session", fields))
+    return events
+
+async def session_event_stream(session_id: str, request: Request):
+    """Yield SSE frames for one session until it is deleted or the client leaves."""
+    subscription = await change_feed.subscribe(session_id)
+    try:
+        # Read list lengths after subscribing so no update falls in between
+        snapshot = await sessions_collection.find_one(
+            {"_id": ObjectId(session_id)},
+            {field: 1 for field in LIST_FIELDS}
+        ) or {}
+        sent = {field: list(snapshot.get(field) or []) for field in LIST_FIELDS}
+        yield _sse("ready", {field: len(items) for field, items in sent.items()})
+
+        while True:
+            change = await subscription.get(settings.SESSION_EVENTS_KEEPALIVE_SECONDS)
+            if await request.is_disconnected():
+                break
+            if change is None:
+                yield ": keepalive\n\n"
+                continue
+
+            operation, updated_fields = change
+            if operation == "closed":
+                break
+            if operation == "delete":
+                yield _sse("deleted", {"id": session_id})
+                break
+            for frame in session_deltas(updated_fields or {}, sent):
+                yield frame
+    finally:
+        await subscription.close()
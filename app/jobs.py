@@ -0,0 +1,147 @@
+# app/jobs.py
+"""
+Durable background job queue.
+
+Jobs live in the jobs collection so they survive restarts. A worker claims a
+job by atomically moving its `available_at` forward by the lease length; if
+the worker dies mid-job the lease expires and another worker picks it up.
+Failed jobs are retried with exponential backoff until JOB_MAX_ATTEMPTS.
+
+While a handler runs the worker renews its lease, so long jobs are not picked
+up twice. Delivery is still at-least-once (a worker can die after the handler
+finished but before the job was deleted), so handlers must be idempotent.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+from pymongo import ReturnDocument
+from app.config import settings
+from app.database import jobs_collection
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+def job_handler(kind: str):
+    """Register a coroutine as the handler for a job kind."""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+async def enqueue(kind: str, payload: Dict[str, Any], delay_seconds: float = 0) -> str:
+    """Persist a job and wake the local worker. Returns the job id."""
+    now = datetime.utcnow()
+    result = await jobs_collection.insert_one({
+        "kind": kind,
+        "payload": payload,
+        "status": "pending",
+        "attempts": 0,
+        "available_at": now + timedelta(seconds=delay_seconds),
+        "created_at": now,
+        "last_error": None,
+    })
+    worker.notify()
+    return str(result.inserted_id)
+
+class JobWorker:
+    """In-process asyncio worker that drains the jobs collection."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def start(self):
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await jobs_collection.find_one_and_update(
+            {"status": {"$in": ["pending", "running"]}, "available_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": "running",
+                    "available_at": now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _renew_lease(self, job_id: Any):
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            try:
+                await jobs_collection.update_one(
+                    {"_id": job_id, "status": "running"},
+                    {"$set": {"available_at": datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS)}},
+                )
+            except Exception as e:
+                logger.warning("Could not renew lease for job %s: %s", job_id, e)
+
+    async def _execute(self, job: Dict[str, Any]):
+        handler = _handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {job['kind']!r}")
+            heartbeat = asyncio.create_task(self._renew_lease(job["_id"]))
+            try:
+                await handler(job["payload"])
+            finally:
+                heartbeat.cancel()
+        except Exception as e:
+            logger.error("Job %s (%s) failed on attempt %s: %s", job['_id'], job['kind'], job['attempts'], e)
+            if job["attempts"] >= settings.JOB_MAX_ATTEMPTS:
+                update = {"status": "failed", "last_error": str(e)}
+            else:
+                backoff = settings.JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                update = {
+                    "status": "pending",
+                    "last_error": str(e),
+                    "available_at": datetime.utcnow() + timedelta(seconds=backoff),
+                }
+            await jobs_collection.update_one({"_id": job["_id"]}, {"$set": update})
+            return
+
+        await jobs_collection.delete_one({"_id": job["_id"]})
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error("Could not claim job: %s", e)
+                job = None
+
+            if job:
+                try:
+                    await self._execute(job)
+                except Exception as e:
+                    # The lease expires and the job is retried
+                    logger.error("Could not record result of job %s: %s", job["_id"], e)
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+worker = JobWorker()
@@ -0,0 +1,122 @@
+# app/logging_config.py
+"""
+Logging setup: JSON lines with request ids, written off the event loop.
+
+Records pass the level and sampling filters on the calling thread, then go
+through a queue to a QueueListener thread that does the JSON encoding and the
+actual write, so a slow stderr or log pipe never blocks a request.
+"""
+
+import json
+import logging
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+# (uvicorn's color_message duplicates the message with terminal escapes)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "color_message"}
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of INFO-and-below records. Warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.INFO or self.rate >= 1.0 or random.random() < self.rate
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class _LoopSafeQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve the message here, so later mutation of the arguments
+        # can't change it; formatting and tracebacks are left to the listener
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def setup_logging() -> QueueListener:
+    """Route all logging through a queue and return the started listener."""
+    queue: SimpleQueue = SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if settings.LOG_JSON:
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    queue_handler = _LoopSafeQueueHandler(queue)
+    queue_handler.addFilter(SamplingFilter(settings.LOG_INFO_SAMPLE_RATE))
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    # Uvicorn gives its loggers their own stream handlers; send them through
+    # the queue too, so the access log is sampled and carries the request id
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    listener = QueueListener(queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+class RequestIdMiddleware:
+    """Tag each request with an id (the client's X-Request-ID or a new one)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -1,16 +1,50 @@
 # app/main.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, sessions, practice, journeys
+from fastapi.responses import JSONResponse
+from pymongo.errors import ExecutionTimeout, NetworkTimeout
+from app.routers import auth, sessions, practice, journeys, dashboard
 from app.config import settings
+from app.database import engine, ensure_indexes
+from app.jobs import worker
+from app.events import configure_change_feed
+from app.write_behind import session_writes
+from app.compression import CompressionMiddleware
+from app.logging_config import setup_logging, RequestIdMiddleware
+from app.deadline import DeadlineMiddleware
+
+log_listener = setup_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await ensure_indexes()
+    await configure_change_feed()
+    await worker.start()
+    yield
+    await session_writes.flush_all()
+    await worker.stop()
+    await engine.close()
+    log_listener.stop()
 
 app = FastAPI(
     title="StrettoNotes API",
     version="0.1.0",
-    description="Voice-first practice journal for musicians"
+    description="Voice-first practice journal for musicians",
+    lifespan=lifespan
 )
 
-# CORS configuration
+# Compress responses the client can decode
+app.add_middleware(CompressionMiddleware)
+
+# Deadline per request; handlers are cancelled when it passes or the client leaves
+app.add_middleware(DeadlineMiddleware)
+
+# Outside the deadline, so every log line of a request carries its id
+app.add_middleware(RequestIdMiddleware)
+
+# CORS configuration. Added last so it is outermost and its headers also
+# reach responses sent by the middlewares above, such as the deadline 504
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
@@ -19,11 +53,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(ExecutionTimeout)
+@app.exception_handler(NetworkTimeout)
+async def deadline_exceeded_handler(request: Request, exc: Exception):
+    """A MongoDB operation ran out of the request's deadline."""
+    return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(sessions.router, prefix="/sessions", tags=["Sessions"])
 app.include_router(practice.router, prefix="/practice", tags=["Practice"])
 app.include_router(journeys.router, prefix="/journeys", tags=["Journeys"])
+app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 
 @app.get("/")
 async def root():
@@ -1,7 +1,8 @@
 # app/models/__init__.py
 
 from .user import User, UserCreate, Token, TokenData
-from .session import Session, SessionCreate, SessionUpdate
+from .session import Session, SessionCreate, SessionUpdate, Insight
 from .practice import Practice, PracticeCreate
-from .journey import Journey, JourneyCreate, JourneyUpdate
-
+from .journey import Journey, JourneyCreate, JourneyUpdate, JourneyItemAdd, JourneyItemMove
+from .dashboard import Dashboard
+from .batch import BatchRequest, BatchResult
@@ -0,0 +1,16 @@
+# app/models/batch.py
+
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+MAX_BATCH_IDS = 200
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=MAX_BATCH_IDS)
+
+class BatchResult(BaseModel, Generic[T]):
+    # Same order as the requested ids; None where an id was not found
+    items: List[Optional[T]]
+    missing: List[str] = []
@@ -0,0 +1,13 @@
+# app/models/dashboard.py
+
+from pydantic import BaseModel
+from typing import Optional, List
+from app.models.session import Session
+from app.models.practice import Practice
+from app.models.journey import Journey
+
+class Dashboard(BaseModel):
+    active_session: Optional[Session] = None
+    recent_sessions: List[Session] = []
+    active_journeys: List[Journey] = []
+    practice_items: List[Practice] = []
@@ -17,6 +17,13 @@ class JourneyUpdate(BaseModel):
     practice_item_ids: Optional[List[str]] = None
     is_active: Optional[bool] = None
 
+class JourneyItemAdd(BaseModel):
+    practice_item_id: str
+    position: Optional[int] = Field(default=None, ge=0)  # None appends
+
+class JourneyItemMove(BaseModel):
+    position: int = Field(ge=0)
+
 class Journey(JourneyBase):
     id: Optional[PyObjectId] = Field(alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,17 +1,48 @@
 # app/models/session.py
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, ValidationInfo, field_validator
 from typing import Optional, List, Dict, Any
+from typing_extensions import Annotated, TypedDict
+from collections import Counter
 from datetime import datetime
 from app.database import PyObjectId
 
+# Types become insight_counts keys, so they must be valid field names.
+# A pattern is checked inside pydantic-core, unlike a Python validator.
+InsightType = Annotated[str, Field(pattern=r"^[^.$][^.]*$")]
+
+class Insight(TypedDict):
+    type: InsightType
+    timestamp: datetime
+    text: str
+
+def count_insights(insights: List[Insight]) -> Dict[str, int]:
+    """Count insights by type."""
+    return dict(Counter(insight["type"] for insight in insights))
+
+_datetime = TypeAdapter(datetime)
+
+def upgrade_insight(entry: Any, fallback_time: Optional[datetime]) -> Optional[Dict[str, Any]]:
+    """Map an insight stored before insights were typed, or None to drop it."""
+    if not isinstance(entry, dict):
+        return None
+    text = next((entry[k] for k in ("text", "note", "content") if entry.get(k) is not None), None)
+    try:
+        timestamp = _datetime.validate_python(entry.get("timestamp"))
+    except ValidationError:
+        # Missing, null or free text such as "yesterday"
+        timestamp = fallback_time
+    if text is None or timestamp is None:
+        return None
+    insight_type = str(entry.get("type") or entry.get("category") or "").replace(".", "_").lstrip("$")
+    return {"type": insight_type or "note", "timestamp": timestamp, "text": str(text)}
+
 class SessionBase(BaseModel):
     subject_id: Optional[str] = None
     start_time: datetime
     end_time: Optional[datetime] = None
-    insights: List[Dict[str, Any]] = []
+    insights: List[Insight] = []
     ai_suggestions: List[Dict[str, Any]] = []
-    insight_counts: Dict[str, int] = {}
     session_summary: Optional[str] = None
     session_journal: Optional[str] = None
     session_focus: Optional[str] = None
@@ -23,9 +54,8 @@ class SessionCreate(SessionBase):
 
 class SessionUpdate(BaseModel):
     end_time: Optional[datetime] = None
-    insights: Optional[List[Dict[str, Any]]] = None
+    insights: Optional[List[Insight]] = None
     ai_suggestions: Optional[List[Dict[str, Any]]] = None
-    insight_counts: Optional[Dict[str, int]] = None
     session_summary: Optional[str] = None
     session_journal: Optional[str] = None
     session_focus: Optional[str] = None
@@ -35,6 +65,17 @@ class SessionUpdate(BaseModel):
 class Session(SessionBase):
     id: Optional[PyObjectId] = Field(alias="_id")
     user_id: Optional[str] = None
+    # Maintained by the server from insights
+    insight_counts: Dict[str, int] = {}
+
+    @field_validator('insights', mode='before')
+    @classmethod
+    def upgrade_legacy_insights(cls, v: Any, info: ValidationInfo) -> Any:
+        """Read insights stored as free-form dicts without failing the whole session"""
+        if not isinstance(v, list):
+            return v
+        fallback_time = info.data.get("start_time")
+        return [i for i in (upgrade_insight(entry, fallback_time) for entry in v) if i is not None]
 
     class Config:
         populate_by_name = True
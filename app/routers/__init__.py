@@ -1,2 +1,2 @@
-from . import auth, sessions, practice, journeys
+from . import auth, sessions, practice, journeys, dashboard
 
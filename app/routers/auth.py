@@ -2,6 +2,7 @@
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from pymongo.errors import DuplicateKeyError
 from app.auth import authenticate_user, create_access_token, get_current_user, get_password_hash
 from app.database import users_collection
 from app.models.user import User, UserCreate, Token
@@ -18,12 +19,12 @@ async def register(user: UserCreate):
     """Register a new user."""
     try:
         # Log registration attempt
-        logger.info(f"Registration attempt for email: {user.email}")
+        logger.info("Registration attempt for email: %s", user.email)
         
         # Check if user exists
         existing_user = await users_collection.find_one({"email": user.email})
         if existing_user:
-            logger.warning(f"Registration failed - email already exists: {user.email}")
+            logger.warning("Registration failed - email already exists: %s", user.email)
             raise HTTPException(
                 status_code=400, 
                 detail=f"Email {user.email} is already registered"
@@ -45,14 +46,14 @@ async def register(user: UserCreate):
         )
         
         if not created_user:
-            logger.error(f"Failed to retrieve created user for email: {user.email}")
+            logger.error("Failed to retrieve created user for email: %s", user.email)
             raise HTTPException(
                 status_code=500,
                 detail="User was created but could not be retrieved"
             )
         
-        logger.info(f"Successfully registered user: {user.email}")
-        logger.debug(f"Created user data: {created_user}")
+        logger.info("Successfully registered user: %s", user.email)
+        logger.debug("Created user data: %s", created_user)
         
         # Convert MongoDB document to User model
         # Make sure _id is properly handled
@@ -63,8 +64,15 @@ async def register(user: UserCreate):
         
     except HTTPException:
         raise
+    except DuplicateKeyError:
+        # Registered concurrently, after our existence check
+        logger.warning("Registration failed - email already exists: %s", user.email)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Email {user.email} is already registered"
+        )
     except Exception as e:
-        logger.error(f"Unexpected error during registration: {str(e)}", exc_info=True)
+        logger.error("Unexpected error during registration: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Registration failed: {str(e)}"
@@ -74,12 +82,12 @@ async def register(user: UserCreate):
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login and get access token."""
     try:
-        logger.info(f"Login attempt for username: {form_data.username}")
+        logger.info("Login attempt for username: %s", form_data.username)
         
         # Authenticate user
         user = await authenticate_user(form_data.username, form_data.password)
         if not user:
-            logger.warning(f"Login failed - invalid credentials for: {form_data.username}")
+            logger.warning("Login failed - invalid credentials for: %s", form_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
@@ -93,13 +101,13 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             expires_delta=access_token_expires
         )
         
-        logger.info(f"Login successful for user: {user.email}")
+        logger.info("Login successful for user: %s", user.email)
         return {"access_token": access_token, "token_type": "bearer"}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during login: {str(e)}", exc_info=True)
+        logger.error("Unexpected error during login: %s", e, exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Login failed: {str(e)}"
@@ -123,7 +131,7 @@ async def health_check():
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(
             status_code=503,
             detail=f"Service unhealthy: {str(e)}"
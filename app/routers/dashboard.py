@@ -0,0 +1,54 @@
+# app/routers/dashboard.py
+import asyncio
+from fastapi import APIRouter, Depends, Query
+from app.auth import get_current_user
+from app.database import sessions_collection, practice_collection, journeys_collection
+from app.models.user import User
+from app.models.dashboard import Dashboard
+from app.write_behind import session_writes
+
+router = APIRouter()
+
+# Home screen lists never need the transcript; it dominates session size.
+SESSION_LIST_PROJECTION = {"full_transcript": 0}
+
+@router.get("/", response_model=Dashboard)
+async def get_dashboard(
+    recent_limit: int = Query(10, ge=1, le=100),
+    journey_limit: int = Query(20, ge=1, le=100),
+    practice_limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user)
+):
+    """Get everything the home screen needs in a single request."""
+    user_id = str(current_user.id)
+
+    active_session, recent_sessions, active_journeys, practice_items = await asyncio.gather(
+        sessions_collection.find_one(
+            {"user_id": user_id, "is_active": True},
+            sort=[("start_time", -1)]
+        ),
+        sessions_collection.find(
+            {"user_id": user_id},
+            SESSION_LIST_PROJECTION
+        ).sort("start_time", -1).limit(recent_limit).to_list(recent_limit),
+        journeys_collection.find(
+            {"user_id": user_id, "is_active": True}
+        ).sort("updated_at", -1).limit(journey_limit).to_list(journey_limit),
+        practice_collection.find(
+            {"user_id": user_id}
+        ).limit(practice_limit).to_list(practice_limit),
+    )
+
+    # Live sessions may have buffered updates that are not written yet
+    active_session = session_writes.overlay([active_session], user_id)[0]
+    recent_sessions = [
+        {k: v for k, v in s.items() if k not in SESSION_LIST_PROJECTION}
+        for s in session_writes.overlay(recent_sessions, user_id)
+    ]
+
+    return {
+        "active_session": active_session,
+        "recent_sessions": recent_sessions,
+        "active_journeys": active_journeys,
+        "practice_items": practice_items,
+    }
@@ -2,10 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.auth import get_current_user
-from app.database import journeys_collection
+from app.singleflight import single_flight
+from app.database import journeys_collection, practice_collection, find_by_ids
 from app.models.user import User
-from app.models.journey import Journey, JourneyCreate, JourneyUpdate
+from app.models.journey import Journey, JourneyCreate, JourneyUpdate, JourneyItemAdd, JourneyItemMove
+from app.models.batch import BatchRequest, BatchResult
+from app.cache import catalog_cache
 from datetime import datetime
 
 router = APIRouter()
@@ -17,10 +21,13 @@ async def get_journeys(
     current_user: User = Depends(get_current_user)
 ):
     """Get all journeys for current user."""
-    journeys = await journeys_collection.find(
-        {"user_id": str(current_user.id)}
-    ).skip(skip).limit(limit).to_list(limit)
-    return journeys
+    async def load():
+        journeys = await journeys_collection.find(
+            {"user_id": str(current_user.id)}
+        ).skip(skip).limit(limit).to_list(limit)
+        return [Journey.model_validate(j).model_dump(mode="json", by_alias=True) for j in journeys]
+
+    return await catalog_cache.get_or_load("journeys", str(current_user.id), f"{skip}:{limit}", load)
 
 @router.post("/", response_model=Journey)
 async def create_journey(
@@ -33,9 +40,26 @@ async def create_journey(
     journey_dict["created_at"] = datetime.utcnow()
     journey_dict["updated_at"] = datetime.utcnow()
     result = await journeys_collection.insert_one(journey_dict)
+    await catalog_cache.invalidate("journeys", str(current_user.id))
     created_journey = await journeys_collection.find_one({"_id": result.inserted_id})
     return Journey.model_validate(created_journey)
 
+@router.post("/batch", response_model=BatchResult[Journey])
+async def get_journey_batch(
+    batch: BatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Get several journeys by id in one request."""
+    invalid = [i for i in batch.ids if not ObjectId.is_valid(i)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid journey IDs: {', '.join(invalid)}")
+    
+    journeys = await find_by_ids(journeys_collection, batch.ids, str(current_user.id))
+    return {
+        "items": journeys,
+        "missing": [i for i, j in zip(batch.ids, journeys) if j is None]
+    }
+
 @router.get("/{journey_id}", response_model=Journey)
 async def get_journey(
     journey_id: str,
@@ -45,10 +69,13 @@ async def get_journey(
     if not ObjectId.is_valid(journey_id):
         raise HTTPException(status_code=400, detail="Invalid journey ID")
     
-    journey = await journeys_collection.find_one({
-        "_id": ObjectId(journey_id),
-        "user_id": str(current_user.id)
-    })
+    journey = await single_flight.do(
+        ("journeys", journey_id, str(current_user.id)),
+        lambda: journeys_collection.find_one({
+            "_id": ObjectId(journey_id),
+            "user_id": str(current_user.id)
+        })
+    )
     if not journey:
         raise HTTPException(status_code=404, detail="Journey not found")
     return Journey(**journey)
@@ -75,10 +102,130 @@ async def update_journey(
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Journey not found")
+        
+        await catalog_cache.invalidate("journeys", str(current_user.id))
     
     updated_journey = await journeys_collection.find_one({"_id": ObjectId(journey_id)})
     return Journey.model_validate(updated_journey)
 
+# Retries for a move that raced with another edit of the same list
+MOVE_ATTEMPTS = 3
+
+async def _update_items(journey_id: str, user_id: str, query: dict, update: dict):
+    """Apply an atomic update to a journey's items and return the updated journey, or None if unmatched."""
+    update.setdefault("$set", {})["updated_at"] = datetime.utcnow()
+    journey = await journeys_collection.find_one_and_update(
+        {"_id": ObjectId(journey_id), "user_id": user_id, **query},
+        update,
+        return_document=ReturnDocument.AFTER
+    )
+    if journey:
+        await catalog_cache.invalidate("journeys", user_id)
+    return journey
+
+async def _get_owned_journey(journey_id: str, user_id: str):
+    journey = await journeys_collection.find_one({"_id": ObjectId(journey_id), "user_id": user_id})
+    if not journey:
+        raise HTTPException(status_code=404, detail="Journey not found")
+    return journey
+
+@router.post("/{journey_id}/items", response_model=Journey)
+async def add_journey_item(
+    journey_id: str,
+    item: JourneyItemAdd,
+    current_user: User = Depends(get_current_user)
+):
+    """Add a practice item to a journey, at the end or at a position."""
+    if not ObjectId.is_valid(journey_id):
+        raise HTTPException(status_code=400, detail="Invalid journey ID")
+    if not ObjectId.is_valid(item.practice_item_id):
+        raise HTTPException(status_code=400, detail="Invalid practice ID")
+    
+    user_id = str(current_user.id)
+    practice = await practice_collection.find_one(
+        {"_id": ObjectId(item.practice_item_id), "user_id": user_id},
+        {"_id": 1}
+    )
+    if not practice:
+        raise HTTPException(status_code=404, detail="Practice not found")
+    
+    if item.position is None:
+        journey = await _update_items(journey_id, user_id, {}, {
+            "$addToSet": {"practice_item_ids": item.practice_item_id}
+        })
+    else:
+        # $addToSet can't insert at a position, so guard $push against duplicates instead
+        journey = await _update_items(
+            journey_id, user_id,
+            {"practice_item_ids": {"$ne": item.practice_item_id}},
+            {"$push": {"practice_item_ids": {"$each": [item.practice_item_id], "$position": item.position}}}
+        )
+    
+    if not journey:
+        # Either the journey doesn't exist or the item is already in it
+        journey = await _get_owned_journey(journey_id, user_id)
+    return Journey.model_validate(journey)
+
+@router.delete("/{journey_id}/items/{practice_item_id}", response_model=Journey)
+async def remove_journey_item(
+    journey_id: str,
+    practice_item_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Remove a practice item from a journey."""
+    if not ObjectId.is_valid(journey_id):
+        raise HTTPException(status_code=400, detail="Invalid journey ID")
+    
+    user_id = str(current_user.id)
+    journey = await _update_items(journey_id, user_id, {"practice_item_ids": practice_item_id}, {
+        "$pull": {"practice_item_ids": practice_item_id}
+    })
+    if not journey:
+        journey = await _get_owned_journey(journey_id, user_id)
+    return Journey.model_validate(journey)
+
+@router.post("/{journey_id}/items/{practice_item_id}/move", response_model=Journey)
+async def move_journey_item(
+    journey_id: str,
+    practice_item_id: str,
+    move: JourneyItemMove,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Move a practice item to a new position within a journey.
+
+    A move can't be expressed with update operators, and the non-Mongo storage
+    engines don't run pipeline updates, so the list is reordered here and
+    written back only if it still equals the list we read. updated_at can't
+    serve as the guard: MongoDB keeps it to the millisecond, so two writes in
+    the same millisecond would leave it unchanged.
+    """
+    if not ObjectId.is_valid(journey_id):
+        raise HTTPException(status_code=400, detail="Invalid journey ID")
+    
+    user_id = str(current_user.id)
+    for _ in range(MOVE_ATTEMPTS):
+        journey = await _get_owned_journey(journey_id, user_id)
+        items = journey.get("practice_item_ids", [])
+        if practice_item_id not in items:
+            raise HTTPException(status_code=404, detail="Practice item not in journey")
+        
+        reordered = [i for i in items if i != practice_item_id]
+        reordered.insert(move.position, practice_item_id)
+        if reordered == items:
+            return Journey.model_validate(journey)
+        
+        # Compare-and-set on the list we read, so a concurrent edit is retried, not clobbered
+        journey = await _update_items(
+            journey_id, user_id,
+            {"practice_item_ids": items},
+            {"$set": {"practice_item_ids": reordered}}
+        )
+        if journey:
+            return Journey.model_validate(journey)
+    
+    raise HTTPException(status_code=409, detail="Journey changed concurrently, try again")
+
 @router.delete("/{journey_id}")
 async def delete_journey(
     journey_id: str,
@@ -96,4 +243,6 @@ async def delete_journey(
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Journey not found")
     
+    await catalog_cache.invalidate("journeys", str(current_user.id))
+    
     return {"message": "Journey deleted successfully"}
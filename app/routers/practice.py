@@ -3,9 +3,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 from bson import ObjectId
 from app.auth import get_current_user
-from app.database import practice_collection
+from app.singleflight import single_flight
+from app.database import practice_collection, find_by_ids
 from app.models.user import User
 from app.models.practice import Practice, PracticeCreate
+from app.models.batch import BatchRequest, BatchResult
+from app.jobs import enqueue
+from app.tasks import PRACTICE_CASCADE_DELETE
+from app.cache import catalog_cache
 
 router = APIRouter()
 
@@ -16,10 +21,13 @@ async def get_practice(
     current_user: User = Depends(get_current_user)
 ):
     """Get all practice for current user."""
-    practices = await practice_collection.find(
-        {"user_id": str(current_user.id)}
-    ).skip(skip).limit(limit).to_list(limit)
-    return practices
+    async def load():
+        practices = await practice_collection.find(
+            {"user_id": str(current_user.id)}
+        ).skip(skip).limit(limit).to_list(limit)
+        return [Practice.model_validate(p).model_dump(mode="json", by_alias=True) for p in practices]
+
+    return await catalog_cache.get_or_load("practice", str(current_user.id), f"{skip}:{limit}", load)
 
 @router.post("/", response_model=Practice)
 async def create_practice(
@@ -30,9 +38,26 @@ async def create_practice(
     practice_dict = practice.dict()
     practice_dict["user_id"] = str(current_user.id)
     result = await practice_collection.insert_one(practice_dict)
+    await catalog_cache.invalidate("practice", str(current_user.id))
     created_practice = await practice_collection.find_one({"_id": result.inserted_id})
     return Practice.model_validate(created_practice)
 
+@router.post("/batch", response_model=BatchResult[Practice])
+async def get_practice_batch(
+    batch: BatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Get several practice items by id in one request."""
+    invalid = [i for i in batch.ids if not ObjectId.is_valid(i)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid practice IDs: {', '.join(invalid)}")
+    
+    practices = await find_by_ids(practice_collection, batch.ids, str(current_user.id))
+    return {
+        "items": practices,
+        "missing": [i for i, p in zip(batch.ids, practices) if p is None]
+    }
+
 @router.get("/{practice_id}", response_model=Practice)
 async def get_practice_by_id(
     practice_id: str,
@@ -42,10 +67,13 @@ async def get_practice_by_id(
     if not ObjectId.is_valid(practice_id):
         raise HTTPException(status_code=400, detail="Invalid practice ID")
 
-    practice = await practice_collection.find_one({
-        "_id": ObjectId(practice_id),
-        "user_id": str(current_user.id)
-    })
+    practice = await single_flight.do(
+        ("practice", practice_id, str(current_user.id)),
+        lambda: practice_collection.find_one({
+            "_id": ObjectId(practice_id),
+            "user_id": str(current_user.id)
+        })
+    )
     if not practice:
         raise HTTPException(status_code=404, detail="Practice not found")
     return Practice(**practice)
@@ -67,5 +95,13 @@ async def delete_practice(
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Practice not found")
     
+    await catalog_cache.invalidate("practice", str(current_user.id))
+    
+    # Journeys and sessions referencing this item are cleaned up in the background
+    await enqueue(PRACTICE_CASCADE_DELETE, {
+        "user_id": str(current_user.id),
+        "practice_id": practice_id
+    })
+    
     return {"message": "Practice deleted successfully"}
 
@@ -1,11 +1,20 @@
 # app/routers/sessions.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.auth import get_current_user
-from app.database import sessions_collection
+from app.singleflight import single_flight
+from app.database import sessions_collection, find_by_ids
 from app.models.user import User
-from app.models.session import Session, SessionCreate, SessionUpdate
+from app.models.session import Session, SessionCreate, SessionUpdate, Insight, count_insights
+from app.models.batch import BatchRequest, BatchResult
+from app import events
+from app.config import settings
+from app.write_behind import session_writes
+from app.compression import precompressed
 
 router = APIRouter()
 
@@ -13,13 +22,44 @@ router = APIRouter()
 async def get_sessions(
     skip: int = 0,
     limit: int = 100,
+    subject_id: Optional[str] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    is_active: Optional[bool] = None,
+    sort: Literal["asc", "desc"] = "desc",
     current_user: User = Depends(get_current_user)
 ):
-    """Get all sessions for current user."""
-    sessions = await sessions_collection.find(
-        {"user_id": str(current_user.id)}
+    """Get sessions for current user, optionally filtered, ordered by start time."""
+    # subject_id and is_active each have a (user_id, ..., start_time) index; when
+    # both are given the subject_id index is used and is_active is checked per document
+    query = {"user_id": str(current_user.id)}
+    if subject_id is not None:
+        query["subject_id"] = subject_id
+    if is_active is not None:
+        query["is_active"] = is_active
+    if start_from or start_to:
+        query["start_time"] = {}
+        if start_from:
+            query["start_time"]["$gte"] = start_from
+        if start_to:
+            query["start_time"]["$lt"] = start_to
+    
+    sessions = await sessions_collection.find(query).sort(
+        "start_time", 1 if sort == "asc" else -1
     ).skip(skip).limit(limit).to_list(limit)
-    return sessions
+    return session_writes.overlay(sessions, str(current_user.id))
+
+@router.get("/active", response_model=List[Session])
+async def get_active_sessions(
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's live sessions, newest first."""
+    user_id = str(current_user.id)
+    # is_active: True lets the planner use the partial active_sessions_by_start index
+    sessions = await sessions_collection.find(
+        {"user_id": user_id, "is_active": True}
+    ).sort("start_time", -1).to_list(None)
+    return session_writes.overlay(sessions, user_id)
 
 @router.post("/", response_model=Session)
 async def create_session(
@@ -29,26 +69,89 @@ async def create_session(
     """Create a new session."""
     session_dict = session.dict()
     session_dict["user_id"] = str(current_user.id)
+    session_dict["insight_counts"] = count_insights(session.insights)
     result = await sessions_collection.insert_one(session_dict)
     created_session = await sessions_collection.find_one({"_id": result.inserted_id})
     return Session.model_validate(created_session)
 
+@router.post("/batch", response_model=BatchResult[Session])
+async def get_session_batch(
+    batch: BatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Get several sessions by id in one request."""
+    invalid = [i for i in batch.ids if not ObjectId.is_valid(i)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid session IDs: {', '.join(invalid)}")
+    
+    user_id = str(current_user.id)
+    sessions = await find_by_ids(sessions_collection, batch.ids, user_id)
+    # Buffered sessions are newer in memory than in the database
+    sessions = session_writes.overlay(sessions, user_id)
+    return {
+        "items": sessions,
+        "missing": [i for i, s in zip(batch.ids, sessions) if s is None]
+    }
+
 @router.get("/{session_id}", response_model=Session)
 async def get_session(
     session_id: str,
+    request: Request,
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific session."""
     if not ObjectId.is_valid(session_id):
         raise HTTPException(status_code=400, detail="Invalid session ID")
     
-    session = await sessions_collection.find_one({
-        "_id": ObjectId(session_id),
-        "user_id": str(current_user.id)
-    })
+    cache_key = ("sessions", str(current_user.id), session_id)
+    cached = precompressed.response(request, cache_key)
+    if cached:
+        return cached
+    # Taken before the read so a write that lands meanwhile stops the fill
+    generation = precompressed.generation
+    
+    buffered = session_writes.get(session_id, str(current_user.id))
+    if buffered:
+        return Session(**buffered)
+    
+    session = await single_flight.do(
+        ("sessions", session_id, str(current_user.id)),
+        lambda: sessions_collection.find_one({
+            "_id": ObjectId(session_id),
+            "user_id": str(current_user.id)
+        })
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    session = Session(**session)
+    if not session.is_active:
+        # Finished sessions only change through PUT, DELETE or a practice cascade, all of which invalidate this entry
+        return precompressed.store(request, cache_key, session.model_dump_json(by_alias=True).encode(), generation)
+    return session
+
+@router.get("/{session_id}/events")
+async def stream_session_events(
+    session_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream live changes to a session as server-sent events."""
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=400, detail="Invalid session ID")
+    
+    session = await sessions_collection.find_one(
+        {"_id": ObjectId(session_id), "user_id": str(current_user.id)},
+        {"_id": 1}
+    )
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return Session(**session)
+    
+    return StreamingResponse(
+        events.session_event_stream(session_id, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.put("/{session_id}", response_model=Session)
 async def update_session(
@@ -62,6 +165,19 @@ async def update_session(
     
     # Remove None values
     update_data = {k: v for k, v in session_update.dict().items() if v is not None}
+    if session_update.insights is not None:
+        update_data["insight_counts"] = count_insights(session_update.insights)
+    
+    ending = update_data.get("is_active") is False or "end_time" in update_data
+    if update_data and settings.SESSION_WRITE_BEHIND and not ending:
+        buffered = await session_writes.update(session_id, str(current_user.id), update_data)
+        if buffered:
+            await events.change_feed.publish(session_id, ("update", update_data))
+            return Session.model_validate(buffered)
+    
+    # Anything still buffered goes out with this write, so ending a session flushes it
+    pending = await session_writes.pop_pending(session_id, str(current_user.id))
+    update_data = {**pending, **update_data}
     
     if update_data:
         result = await sessions_collection.update_one(
@@ -71,10 +187,59 @@ async def update_session(
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Session not found")
+        
+        precompressed.invalidate(("sessions", str(current_user.id), session_id))
+        await events.change_feed.publish(session_id, ("update", update_data))
     
     updated_session = await sessions_collection.find_one({"_id": ObjectId(session_id)})
     return Session.model_validate(updated_session)
 
+@router.post("/{session_id}/insights", response_model=Session)
+async def append_insights(
+    session_id: str,
+    insights: List[Insight],
+    current_user: User = Depends(get_current_user)
+):
+    """Append insights to a session without re-uploading the whole list."""
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=400, detail="Invalid session ID")
+    if not insights:
+        raise HTTPException(status_code=400, detail="No insights to append")
+    
+    update = {}
+    
+    # Buffered fields are written together with the append
+    pending = await session_writes.pop_pending(session_id, str(current_user.id))
+    if "insights" in pending:
+        # A buffered full list would conflict with $push, so extend it instead
+        all_insights = pending["insights"] + insights
+        pending["insights"] = all_insights
+        pending["insight_counts"] = count_insights(all_insights)
+    else:
+        update["$push"] = {"insights": {"$each": insights}}
+        update["$inc"] = {
+            f"insight_counts.{insight_type}": count
+            for insight_type, count in count_insights(insights).items()
+        }
+    if pending:
+        update["$set"] = pending
+    
+    updated_session = await sessions_collection.find_one_and_update(
+        {"_id": ObjectId(session_id), "user_id": str(current_user.id)},
+        update,
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    precompressed.invalidate(("sessions", str(current_user.id), session_id))
+    await events.change_feed.publish(session_id, ("update", {
+        **pending,
+        "insights": updated_session.get("insights", []),
+        "insight_counts": updated_session.get("insight_counts", {}),
+    }))
+    return Session.model_validate(updated_session)
+
 @router.delete("/{session_id}")
 async def delete_session(
     session_id: str,
@@ -84,6 +249,7 @@ async def delete_session(
     if not ObjectId.is_valid(session_id):
         raise HTTPException(status_code=400, detail="Invalid session ID")
     
+    await session_writes.pop_pending(session_id, str(current_user.id))
     result = await sessions_collection.delete_one({
         "_id": ObjectId(session_id),
         "user_id": str(current_user.id)
@@ -92,4 +258,7 @@ async def delete_session(
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    precompressed.invalidate(("sessions", str(current_user.id), session_id))
+    await events.change_feed.publish(session_id, ("delete", None))
+    
     return {"message": "Session deleted successfully"}
@@ -0,0 +1,49 @@
+# app/singleflight.py
+"""
+Coalesce identical concurrent reads.
+
+When several requests ask for the same thing at once (typically a client
+reconnecting and replaying its requests) only the first one runs the query;
+the rest await the same task and share its result.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+import pymongo
+from app.config import settings
+
+T = TypeVar("T")
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func, or join the call already in flight for key."""
+        call = self._calls.get(key)
+        if call is None:
+            # Fresh context: the shared call must not inherit the first
+            # caller's deadline, or its timeout would fail every waiter
+            call = asyncio.get_running_loop().create_task(self._run(func), context=contextvars.Context())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so one waiter being cancelled does not cancel the shared call
+        return await asyncio.shield(call)
+
+    @staticmethod
+    async def _run(func: Callable[[], Awaitable[T]]) -> T:
+        # Still bounded, by the default request deadline, so every query keeps a maxTimeMS
+        deadline_ms = settings.REQUEST_DEADLINE_MS
+        with pymongo.timeout(deadline_ms / 1000) if deadline_ms else contextlib.nullcontext():
+            return await func()
+
+    def _forget(self, key: Hashable, call: "asyncio.Future[Any]"):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Mark the exception as retrieved in case every waiter went away
+            call.exception()
+
+single_flight = SingleFlight()
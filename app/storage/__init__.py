@@ -0,0 +1,19 @@
+# app/storage/__init__.py
+
+from typing import Optional
+from app.config import settings
+from .base import StorageEngine
+
+def create_engine(name: Optional[str] = None) -> StorageEngine:
+    """Build the storage engine named by STORAGE_ENGINE (mongo, memory or sqlite)."""
+    name = name or settings.STORAGE_ENGINE
+    if name == "mongo":
+        from .motor import MotorEngine
+        return MotorEngine(settings.MONGODB_URL, settings.DATABASE_NAME)
+    if name == "memory":
+        from .memory import MemoryEngine
+        return MemoryEngine()
+    if name == "sqlite":
+        from .sqlite import SQLiteEngine
+        return SQLiteEngine(settings.SQLITE_PATH)
+    raise ValueError(f"Unknown storage engine: {name}")
@@ -0,0 +1,215 @@
+# app/storage/base.py
+"""
+Storage engine interface.
+
+Routers use collections through the subset of Motor's collection API listed on
+DocumentCollection, so the Motor engine hands out Motor collections unchanged
+and the other engines implement that subset on top of a plain document store.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.storage.query import SortSpec, apply_update, index_name, matches, normalize_sort, project, sort_documents
+
+class InsertOneResult:
+    def __init__(self, inserted_id: Any):
+        self.inserted_id = inserted_id
+
+class InsertManyResult:
+    def __init__(self, inserted_ids: List[Any]):
+        self.inserted_ids = inserted_ids
+
+class UpdateResult:
+    def __init__(self, matched_count: int, modified_count: int):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+class StorageEngine:
+    name: str = ""
+
+    def collection(self, name: str) -> Any:
+        raise NotImplementedError
+
+    async def ping(self):
+        raise NotImplementedError
+
+    async def supports_change_streams(self) -> bool:
+        return False
+
+    async def close(self):
+        pass
+
+class Cursor:
+    """Lazy find() result supporting sort/skip/limit chaining like a Motor cursor."""
+
+    def __init__(self, collection: "DocumentCollection", filter: Optional[Dict[str, Any]],
+                 projection: Optional[Dict[str, Any]], sort: List[Tuple[str, int]]):
+        self._collection = collection
+        self._filter = filter
+        self._projection = projection
+        self._sort = sort
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list: SortSpec, direction: Optional[int] = None) -> "Cursor":
+        self._sort = normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int) -> "Cursor":
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "Cursor":
+        self._limit = limit
+        return self
+
+    async def to_list(self, length: Optional[int]) -> List[Dict[str, Any]]:
+        limit = self._limit
+        if length:
+            limit = min(limit, length) if limit else length
+        return await self._collection._find(self._filter, self._projection, self._sort, self._skip, limit)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in await self.to_list(None):
+            yield document
+
+class DocumentCollection:
+    """
+    Motor-compatible collection over a document store.
+
+    Subclasses provide storage primitives (_scan, _insert, _replace, _remove);
+    querying, updating and projection semantics live here and in query.py.
+    """
+
+    def __init__(self, name: str, lock: asyncio.Lock):
+        self.name = name
+        # Serializes read-modify-write operations so updates stay atomic
+        self._lock = lock
+
+    # Storage primitives
+
+    async def _scan(self, filter: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return stored documents that may match filter (a superset is fine)."""
+        raise NotImplementedError
+
+    async def _insert(self, documents: List[Dict[str, Any]]):
+        """Store new documents, raising DuplicateKeyError on an existing _id."""
+        raise NotImplementedError
+
+    async def _replace(self, document: Dict[str, Any]):
+        raise NotImplementedError
+
+    async def _remove(self, ids: List[Any]):
+        raise NotImplementedError
+
+    async def _add_index(self, keys: List[Tuple[str, int]], name: str, options: Dict[str, Any]):
+        pass
+
+    # Motor API subset
+
+    async def _matching(self, filter: Optional[Dict[str, Any]], sort: List[Tuple[str, int]] = ()) -> List[Dict[str, Any]]:
+        filter = filter or {}
+        documents = [d for d in await self._scan(filter) if matches(d, filter)]
+        return sort_documents(documents, list(sort)) if sort else documents
+
+    async def _find(self, filter, projection, sort, skip, limit) -> List[Dict[str, Any]]:
+        documents = await self._matching(filter, sort)
+        documents = documents[skip:skip + limit] if limit else documents[skip:]
+        return [project(d, projection) for d in documents]
+
+    def find(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None,
+             sort: SortSpec = None, **kwargs) -> Cursor:
+        return Cursor(self, filter, projection, normalize_sort(sort))
+
+    async def find_one(self, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None,
+                       sort: SortSpec = None, **kwargs) -> Optional[Dict[str, Any]]:
+        documents = await self._find(filter, projection, normalize_sort(sort), 0, 1)
+        return documents[0] if documents else None
+
+    async def count_documents(self, filter: Dict[str, Any], **kwargs) -> int:
+        return len(await self._matching(filter))
+
+    async def insert_one(self, document: Dict[str, Any], **kwargs) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        async with self._lock:
+            await self._insert([project(document, None)])
+        return InsertOneResult(document["_id"])
+
+    async def insert_many(self, documents: List[Dict[str, Any]], ordered: bool = True, **kwargs) -> InsertManyResult:
+        inserted, errors = [], []
+        async with self._lock:
+            for index, document in enumerate(documents):
+                document.setdefault("_id", ObjectId())
+                try:
+                    await self._insert([project(document, None)])
+                    inserted.append(document["_id"])
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": document})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return InsertManyResult(inserted)
+
+    async def _update(self, filter, update, many: bool, sort: SortSpec = None) -> Tuple[int, int, List[Dict[str, Any]]]:
+        matched, modified, updated = 0, 0, []
+        for document in await self._matching(filter, normalize_sort(sort)):
+            matched += 1
+            document = project(document, None)
+            if apply_update(document, update):
+                modified += 1
+                await self._replace(document)
+            updated.append(document)
+            if not many:
+                break
+        return matched, modified, updated
+
+    async def update_one(self, filter: Dict[str, Any], update: Dict[str, Any], **kwargs) -> UpdateResult:
+        async with self._lock:
+            matched, modified, _ = await self._update(filter, update, many=False)
+        return UpdateResult(matched, modified)
+
+    async def update_many(self, filter: Dict[str, Any], update: Dict[str, Any], **kwargs) -> UpdateResult:
+        async with self._lock:
+            matched, modified, _ = await self._update(filter, update, many=True)
+        return UpdateResult(matched, modified)
+
+    async def find_one_and_update(self, filter: Dict[str, Any], update: Dict[str, Any],
+                                  projection: Optional[Dict[str, Any]] = None, sort: SortSpec = None,
+                                  return_document: bool = False, **kwargs) -> Optional[Dict[str, Any]]:
+        # return_document follows pymongo's ReturnDocument: False is BEFORE, True is AFTER
+        async with self._lock:
+            before = await self._matching(filter, normalize_sort(sort))
+            if not before:
+                return None
+            _, _, updated = await self._update({"_id": before[0]["_id"]}, update, many=False)
+        return project(updated[0] if return_document else before[0], projection)
+
+    async def delete_one(self, filter: Dict[str, Any], **kwargs) -> DeleteResult:
+        async with self._lock:
+            documents = await self._matching(filter)
+            if documents:
+                await self._remove([documents[0]["_id"]])
+        return DeleteResult(1 if documents else 0)
+
+    async def delete_many(self, filter: Dict[str, Any], **kwargs) -> DeleteResult:
+        async with self._lock:
+            documents = await self._matching(filter)
+            if documents:
+                await self._remove([d["_id"] for d in documents])
+        return DeleteResult(len(documents))
+
+    async def create_index(self, keys: Sequence[Tuple[str, int]], **kwargs) -> str:
+        keys = normalize_sort(keys)
+        name = kwargs.get("name") or index_name(keys)
+        await self._add_index(keys, name, kwargs)
+        return name
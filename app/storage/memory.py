@@ -0,0 +1,104 @@
+# app/storage/memory.py
+
+import asyncio
+from typing import Any, Dict, Hashable, List, Set, Tuple
+from pymongo.errors import DuplicateKeyError
+from app.storage.base import DocumentCollection, StorageEngine
+from app.storage.query import get_path, _MISSING
+
+def _index_values(value: Any) -> List[Any]:
+    """Keys a field value is indexed under: each element for arrays, like a multikey index."""
+    if value is _MISSING:
+        value = None
+    values = value if isinstance(value, list) else [value]
+    return [v for v in values if isinstance(v, Hashable)]
+
+class MemoryCollection(DocumentCollection):
+    def __init__(self, name: str):
+        super().__init__(name, asyncio.Lock())
+        self._documents: Dict[Any, Dict[str, Any]] = {}
+        # field -> value -> ids; one per indexed leading field
+        self._indexes: Dict[str, Dict[Any, Set[Any]]] = {}
+        self._unique: Set[str] = set()
+
+    def _index(self, document: Dict[str, Any]):
+        for field, index in self._indexes.items():
+            for value in _index_values(get_path(document, field)):
+                index.setdefault(value, set()).add(document["_id"])
+
+    def _unindex(self, document: Dict[str, Any]):
+        for field, index in self._indexes.items():
+            for value in _index_values(get_path(document, field)):
+                ids = index.get(value)
+                if ids is not None:
+                    ids.discard(document["_id"])
+                    if not ids:
+                        del index[value]
+
+    async def _scan(self, filter: Dict[str, Any]) -> List[Dict[str, Any]]:
+        _id = filter.get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            document = self._documents.get(_id)
+            return [document] if document else []
+        # Narrow by the most selective usable index
+        candidates = None
+        for field, index in self._indexes.items():
+            value = filter.get(field, _MISSING)
+            if value is _MISSING or isinstance(value, (dict, list)) or not isinstance(value, Hashable):
+                continue
+            ids = index.get(value, set())
+            if candidates is None or len(ids) < len(candidates):
+                candidates = ids
+        if candidates is None:
+            return list(self._documents.values())
+        return [self._documents[i] for i in candidates]
+
+    async def _insert(self, documents: List[Dict[str, Any]]):
+        for document in documents:
+            if document["_id"] in self._documents:
+                raise DuplicateKeyError(f"Duplicate _id {document['_id']} in {self.name}")
+            for field in self._unique:
+                for value in _index_values(get_path(document, field)):
+                    if self._indexes[field].get(value):
+                        raise DuplicateKeyError(f"Duplicate {field} {value!r} in {self.name}")
+            self._documents[document["_id"]] = document
+            self._index(document)
+
+    async def _replace(self, document: Dict[str, Any]):
+        self._unindex(self._documents[document["_id"]])
+        self._documents[document["_id"]] = document
+        self._index(document)
+
+    async def _remove(self, ids: List[Any]):
+        for _id in ids:
+            document = self._documents.pop(_id, None)
+            if document is not None:
+                self._unindex(document)
+
+    async def _add_index(self, keys: List[Tuple[str, int]], name: str, options: Dict[str, Any]):
+        # Compound and partial indexes are approximated by an index on the leading field
+        field = keys[0][0]
+        if options.get("unique") and len(keys) == 1:
+            self._unique.add(field)
+        if field in self._indexes or field == "_id":
+            return
+        self._indexes[field] = {}
+        for document in self._documents.values():
+            for value in _index_values(get_path(document, field)):
+                self._indexes[field].setdefault(value, set()).add(document["_id"])
+
+class MemoryEngine(StorageEngine):
+    """Process-local engine for tests, benchmarks and single-process deployments."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def collection(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
+    async def ping(self):
+        pass
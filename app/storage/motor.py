@@ -0,0 +1,27 @@
+# app/storage/motor.py
+
+from typing import Any
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.storage.base import StorageEngine
+
+class MotorEngine(StorageEngine):
+    """MongoDB through Motor. Collections are Motor's own."""
+
+    name = "mongo"
+
+    def __init__(self, url: str, database: str):
+        self.client = AsyncIOMotorClient(url)
+        self.db = self.client[database]
+
+    def collection(self, name: str) -> Any:
+        return self.db[name]
+
+    async def ping(self):
+        await self.client.admin.command("ping")
+
+    async def supports_change_streams(self) -> bool:
+        hello = await self.client.admin.command("hello")
+        return "setName" in hello
+
+    async def close(self):
+        self.client.close()
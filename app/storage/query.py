@@ -0,0 +1,220 @@
+# app/storage/query.py
+"""
+MongoDB query, update, projection and sort semantics for the non-Mongo engines.
+
+Covers the subset the API uses: equality (including array membership), $in,
+$nin, $ne, $gt/$gte/$lt/$lte, $exists, $and/$or on dotted paths; $set, $unset,
+$inc, $push ($each/$position), $addToSet ($each) and $pull on updates.
+"""
+
+import copy
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from bson import ObjectId
+
+_MISSING = object()
+
+SortSpec = Union[str, Sequence[Tuple[str, int]], None]
+
+def get_path(document: Dict[str, Any], path: str) -> Any:
+    value: Any = document
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+def _parent(document: Dict[str, Any], path: str, create: bool) -> Tuple[Any, str]:
+    parts = path.split(".")
+    target: Any = document
+    for part in parts[:-1]:
+        if isinstance(target, list) and part.isdigit():
+            target = target[int(part)]
+            continue
+        if part not in target or target[part] is None:
+            if not create:
+                return None, parts[-1]
+            target[part] = {}
+        target = target[part]
+    return target, parts[-1]
+
+def set_path(document: Dict[str, Any], path: str, value: Any):
+    parent, key = _parent(document, path, create=True)
+    if isinstance(parent, list) and key.isdigit():
+        parent[int(key)] = value
+    else:
+        parent[key] = value
+
+def unset_path(document: Dict[str, Any], path: str):
+    parent, key = _parent(document, path, create=False)
+    if isinstance(parent, dict):
+        parent.pop(key, None)
+
+def _compare(value: Any, operand: Any, op: str) -> bool:
+    if value is _MISSING or value is None or operand is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > operand
+        if op == "$gte":
+            return value >= operand
+        if op == "$lt":
+            return value < operand
+        return value <= operand
+    except TypeError:
+        return False
+
+def _equals(value: Any, operand: Any) -> bool:
+    if operand is None:
+        return value is _MISSING or value is None
+    if value is _MISSING:
+        return False
+    if isinstance(value, list) and not isinstance(operand, list):
+        return operand in value
+    return value == operand
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        for op, operand in condition.items():
+            if op == "$eq":
+                ok = _equals(value, operand)
+            elif op == "$ne":
+                ok = not _equals(value, operand)
+            elif op == "$in":
+                ok = any(_equals(value, o) for o in operand)
+            elif op == "$nin":
+                ok = not any(_equals(value, o) for o in operand)
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                ok = _compare(value, operand, op)
+            elif op == "$exists":
+                ok = (value is not _MISSING) == bool(operand)
+            else:
+                raise ValueError(f"Unsupported query operator {op}")
+            if not ok:
+                return False
+        return True
+    return _equals(value, condition)
+
+def matches(document: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    """Return True if document satisfies the MongoDB-style query."""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(document, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, q) for q in condition):
+                return False
+        elif not _match_condition(get_path(document, key), condition):
+            return False
+    return True
+
+def apply_update(document: Dict[str, Any], update: Dict[str, Any]) -> bool:
+    """Apply update operators in place. Returns True if the document changed."""
+    before = copy.deepcopy(document)
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == "$set":
+                set_path(document, path, copy.deepcopy(value))
+            elif op == "$unset":
+                unset_path(document, path)
+            elif op == "$inc":
+                current = get_path(document, path)
+                set_path(document, path, (0 if current in (_MISSING, None) else current) + value)
+            elif op in ("$push", "$addToSet"):
+                current = get_path(document, path)
+                items = current if isinstance(current, list) else []
+                if isinstance(value, dict) and "$each" in value:
+                    new_items, position = value["$each"], value.get("$position")
+                else:
+                    new_items, position = [value], None
+                if op == "$addToSet":
+                    unique = []
+                    for item in new_items:
+                        if item not in items and item not in unique:
+                            unique.append(item)
+                    new_items = unique
+                new_items = copy.deepcopy(new_items)
+                if position is None:
+                    items = items + new_items
+                else:
+                    items = items[:position] + new_items + items[position:]
+                set_path(document, path, items)
+            elif op == "$pull":
+                current = get_path(document, path)
+                if isinstance(current, list):
+                    if isinstance(value, dict):
+                        kept = [i for i in current if not (
+                            matches(i, value) if isinstance(i, dict) else _match_condition(i, value)
+                        )]
+                    else:
+                        kept = [i for i in current if i != value]
+                    set_path(document, path, kept)
+            else:
+                raise ValueError(f"Unsupported update operator {op}")
+    return document != before
+
+def project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply an inclusion or exclusion projection to a copy of document."""
+    if not projection:
+        return copy.deepcopy(document)
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    # {"_id": 1} alone is an inclusion projection of just the id
+    if all(fields.values()) and (fields or include_id):
+        result: Dict[str, Any] = {}
+        for path in fields:
+            value = get_path(document, path)
+            if value is not _MISSING:
+                set_path(result, path, copy.deepcopy(value))
+        if include_id and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    result = copy.deepcopy(document)
+    for path in fields:
+        unset_path(result, path)
+    if not include_id:
+        result.pop("_id", None)
+    return result
+
+def normalize_sort(key_or_list: SortSpec, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return list(key_or_list)
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """Order values across types the way MongoDB does: by BSON type first, then by value."""
+    if value is _MISSING or value is None:
+        return (1, 0)
+    if isinstance(value, bool):
+        return (8, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    if isinstance(value, dict):
+        return (4, tuple((k, _sort_key(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return (5, tuple(_sort_key(v) for v in value))
+    if isinstance(value, bytes):
+        return (6, value)
+    if isinstance(value, ObjectId):
+        return (7, value)
+    if isinstance(value, datetime):
+        return (9, value)
+    return (10, str(value))
+
+def sort_documents(documents: List[Dict[str, Any]], sort: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    # Stable sorts applied from the last key to the first; missing/None sort lowest like MongoDB
+    for path, direction in reversed(sort):
+        documents.sort(key=lambda document, path=path: _sort_key(get_path(document, path)), reverse=direction < 0)
+    return documents
+
+def index_name(keys: Sequence[Tuple[str, int]]) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
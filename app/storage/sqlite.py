@@ -0,0 +1,137 @@
+# app/storage/sqlite.py
+
+import asyncio
+import sqlite3
+from typing import Any, Dict, List, Set, Tuple
+from bson import json_util
+from pymongo.errors import DuplicateKeyError
+from app.storage.base import DocumentCollection, StorageEngine
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _json_path(field: str) -> str:
+    return "$." + field
+
+class SQLiteCollection(DocumentCollection):
+    """
+    One table per collection: the _id as text key plus the document as a JSON
+    column (MongoDB extended JSON, so ObjectIds and datetimes round-trip).
+
+    Indexes become expression indexes on json_extract(). Equality filters on
+    indexed fields are pushed down to SQL so those indexes get used; the rest
+    of the query is evaluated in Python. Indexed fields are assumed scalar.
+    """
+
+    def __init__(self, engine: "SQLiteEngine", name: str):
+        super().__init__(name, engine.lock)
+        self._engine = engine
+        self._table = _quote(name)
+        self._created = False
+        self._indexed_fields: Set[str] = set()
+
+    async def _db(self):
+        db = await self._engine.connection()
+        if not self._created:
+            await db.execute(f"CREATE TABLE IF NOT EXISTS {self._table} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+            await db.commit()
+            self._created = True
+        return db
+
+    @staticmethod
+    def _encode(document: Dict[str, Any]) -> str:
+        return json_util.dumps(document)
+
+    @staticmethod
+    def _decode(text: str) -> Dict[str, Any]:
+        return json_util.loads(text)
+
+    async def _scan(self, filter: Dict[str, Any]) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        _id = filter.get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            clauses.append("id = ?")
+            params.append(str(_id))
+        for field in self._indexed_fields:
+            value = filter.get(field)
+            if isinstance(value, (str, int, float, bool)):
+                clauses.append(f"json_extract(doc, '{_json_path(field)}') = ?")
+                params.append(value)
+        sql = f"SELECT doc FROM {self._table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        db = await self._db()
+        async with db.execute(sql, params) as cursor:
+            return [self._decode(row[0]) async for row in cursor]
+
+    async def _insert(self, documents: List[Dict[str, Any]]):
+        db = await self._db()
+        try:
+            await db.executemany(
+                f"INSERT INTO {self._table} (id, doc) VALUES (?, ?)",
+                [(str(d["_id"]), self._encode(d)) for d in documents]
+            )
+        except sqlite3.IntegrityError as e:
+            await db.rollback()
+            raise DuplicateKeyError(f"Duplicate _id in {self.name}: {str(e)}")
+        await db.commit()
+
+    async def _replace(self, document: Dict[str, Any]):
+        db = await self._db()
+        await db.execute(
+            f"UPDATE {self._table} SET doc = ? WHERE id = ?",
+            (self._encode(document), str(document["_id"]))
+        )
+        await db.commit()
+
+    async def _remove(self, ids: List[Any]):
+        db = await self._db()
+        await db.executemany(f"DELETE FROM {self._table} WHERE id = ?", [(str(i),) for i in ids])
+        await db.commit()
+
+    async def _add_index(self, keys: List[Tuple[str, int]], name: str, options: Dict[str, Any]):
+        fields = [field for field, _ in keys if field != "_id"]
+        if not fields:
+            return
+        columns = ", ".join(f"json_extract(doc, '{_json_path(field)}')" for field in fields)
+        db = await self._db()
+        unique = "UNIQUE " if options.get("unique") else ""
+        await db.execute(
+            f"CREATE {unique}INDEX IF NOT EXISTS {_quote(self.name + '_' + name)} ON {self._table} ({columns})"
+        )
+        await db.commit()
+        self._indexed_fields.update(fields)
+
+class SQLiteEngine(StorageEngine):
+    """Single-file engine on aiosqlite, for small deployments without MongoDB."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        # One connection, so one lock covers every read-modify-write
+        self.lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+        self._connection = None
+        self._collections: Dict[str, SQLiteCollection] = {}
+
+    async def connection(self):
+        async with self._connect_lock:
+            if self._connection is None:
+                import aiosqlite  # only needed when this engine is selected
+                self._connection = await aiosqlite.connect(self.path)
+        return self._connection
+
+    def collection(self, name: str) -> SQLiteCollection:
+        if name not in self._collections:
+            self._collections[name] = SQLiteCollection(self, name)
+        return self._collections[name]
+
+    async def ping(self):
+        db = await self.connection()
+        await db.execute("SELECT 1")
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
@@ -0,0 +1,30 @@
+# app/tasks.py
+"""Handlers for deferred work run by the job worker in app/jobs.py."""
+
+from datetime import datetime
+from app.database import sessions_collection, journeys_collection
+from app.jobs import job_handler
+from app.compression import precompressed
+from app.cache import catalog_cache
+
+PRACTICE_CASCADE_DELETE = "practice.cascade_delete"
+
+@job_handler(PRACTICE_CASCADE_DELETE)
+async def cascade_practice_delete(payload: dict):
+    """Remove references to a deleted practice item from journeys and sessions."""
+    user_id = payload["user_id"]
+    practice_id = payload["practice_id"]
+
+    await journeys_collection.update_many(
+        {"user_id": user_id, "practice_item_ids": practice_id},
+        {
+            "$pull": {"practice_item_ids": practice_id},
+            "$set": {"updated_at": datetime.utcnow()},
+        }
+    )
+    await catalog_cache.invalidate("journeys", user_id)
+    await sessions_collection.update_many(
+        {"user_id": user_id, "subject_id": practice_id},
+        {"$set": {"subject_id": None}}
+    )
+    precompressed.invalidate_prefix(("sessions", user_id))
@@ -0,0 +1,137 @@
+# app/write_behind.py
+"""
+Write-behind buffer for live session updates.
+
+Clients update an active session several times a second while transcript text
+and insights arrive. With SESSION_WRITE_BEHIND enabled those updates are merged
+in memory per session and written with a single `$set` once the window
+(SESSION_WRITE_BEHIND_WINDOW_MS) has passed. Reads of a buffered session are
+answered from the merged document, so a client always sees its own writes.
+"""
+
+import asyncio
+import contextvars
+import logging
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from app.config import settings
+from app.database import sessions_collection
+
+logger = logging.getLogger(__name__)
+
+class _Buffer:
+    def __init__(self, user_id: str, document: Dict[str, Any]):
+        self.user_id = user_id
+        self.document = document
+        self.pending: Dict[str, Any] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+        # Held while a flush is writing, so nothing overtakes it
+        self.lock = asyncio.Lock()
+
+class SessionWriteBuffer:
+    def __init__(self):
+        self._buffers: Dict[str, _Buffer] = {}
+
+    def get(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the merged document for a buffered session, if any."""
+        buffer = self._buffers.get(session_id)
+        if buffer is None or buffer.user_id != user_id:
+            return None
+        return dict(buffer.document)
+
+    def overlay(
+        self, documents: List[Optional[Dict[str, Any]]], user_id: str
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Replace stored sessions that have buffered updates with the merged document."""
+        return [d and (self.get(str(d["_id"]), user_id) or d) for d in documents]
+
+    async def update(
+        self, session_id: str, user_id: str, update_data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Merge an update into the session's buffer and return the merged document.
+
+        Returns None when the session is not found or not active; the caller
+        should then write directly.
+        """
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            document = await sessions_collection.find_one(
+                {"_id": ObjectId(session_id), "user_id": user_id}
+            )
+            if not document or not document.get("is_active"):
+                return None
+            # Another update may have created the buffer while we were reading
+            buffer = self._buffers.setdefault(session_id, _Buffer(user_id, document))
+
+        if buffer.user_id != user_id:
+            return None
+
+        buffer.pending.update(update_data)
+        buffer.document.update(update_data)
+        if buffer.flush_task is None:
+            # Fresh context: the flush must not inherit this request's deadline
+            buffer.flush_task = asyncio.create_task(
+                self._flush_later(session_id, buffer), context=contextvars.Context()
+            )
+        return dict(buffer.document)
+
+    async def pop_pending(self, session_id: str, user_id: str) -> Dict[str, Any]:
+        """
+        Drop a session's buffer and hand back its unwritten fields.
+
+        Waits for a flush that is already writing, so the caller's own write
+        always lands after it and cannot be rolled back by an older `$set`.
+        """
+        buffer = self._buffers.get(session_id)
+        if buffer is None or buffer.user_id != user_id:
+            return {}
+        del self._buffers[session_id]
+        async with buffer.lock:
+            if buffer.flush_task:
+                # Only reachable while it sleeps or waits for the lock
+                buffer.flush_task.cancel()
+            return dict(buffer.pending)
+
+    async def flush(self, session_id: str):
+        """Write a session's pending fields now and drop its buffer."""
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            return
+        pending = await self.pop_pending(session_id, buffer.user_id)
+        if pending:
+            await sessions_collection.update_one(
+                {"_id": ObjectId(session_id), "user_id": buffer.user_id},
+                {"$set": pending}
+            )
+
+    async def flush_all(self):
+        """Flush every buffered session. Called on shutdown."""
+        for session_id in list(self._buffers):
+            try:
+                await self.flush(session_id)
+            except Exception as e:
+                logger.error("Could not flush buffered session %s: %s", session_id, e)
+
+    async def _flush_later(self, session_id: str, buffer: _Buffer):
+        while True:
+            await asyncio.sleep(settings.SESSION_WRITE_BEHIND_WINDOW_MS / 1000)
+            if not buffer.pending:
+                break
+            async with buffer.lock:
+                inflight, buffer.pending = buffer.pending, {}
+                try:
+                    await sessions_collection.update_one(
+                        {"_id": ObjectId(session_id), "user_id": buffer.user_id},
+                        {"$set": inflight}
+                    )
+                except Exception as e:
+                    logger.error("Write-behind flush failed for session %s: %s", session_id, e)
+                    # Keep the fields for the next window; newer values win
+                    buffer.pending = {**inflight, **buffer.pending}
+        # Everything is written; the next update starts a fresh buffer
+        buffer.flush_task = None
+        if self._buffers.get(session_id) is buffer:
+            del self._buffers[session_id]
+
+session_writes = SessionWriteBuffer()
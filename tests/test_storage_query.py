@@ -0,0 +1,115 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.storage.query import apply_update, matches, project, sort_documents
+
+SESSION = {
+    "_id": "s1",
+    "user_id": "u1",
+    "is_active": True,
+    "start_time": datetime(2024, 1, 1, 10),
+    "tags": ["scales", "bach"],
+    "insight_counts": {"tempo": 2},
+    "subject_id": None,
+}
+
+class TestMatches:
+    def test_equality_and_array_membership(self):
+        assert matches(SESSION, {"user_id": "u1", "tags": "bach"})
+        assert not matches(SESSION, {"tags": "chopin"})
+
+    def test_none_matches_missing_and_null(self):
+        assert matches(SESSION, {"subject_id": None})
+        assert matches(SESSION, {"end_time": None})
+        assert not matches(SESSION, {"user_id": None})
+
+    def test_comparison_operators(self):
+        assert matches(SESSION, {"start_time": {"$gte": datetime(2024, 1, 1), "$lt": datetime(2024, 1, 2)}})
+        assert not matches(SESSION, {"start_time": {"$gt": datetime(2024, 1, 1, 10)}})
+
+    def test_comparison_across_types_never_matches(self):
+        assert not matches(SESSION, {"start_time": {"$gt": 5}})
+
+    def test_in_nin_ne_exists(self):
+        assert matches(SESSION, {"user_id": {"$in": ["u1", "u2"]}})
+        assert matches(SESSION, {"tags": {"$nin": ["chopin"]}})
+        assert matches(SESSION, {"user_id": {"$ne": "u2"}})
+        assert matches(SESSION, {"insight_counts.tempo": {"$exists": True}})
+        assert matches(SESSION, {"insight_counts.memory": {"$exists": False}})
+
+    def test_dotted_paths_and_logical_operators(self):
+        assert matches(SESSION, {"insight_counts.tempo": 2})
+        assert matches(SESSION, {"$or": [{"user_id": "u2"}, {"tags.1": "bach"}]})
+        assert not matches(SESSION, {"$and": [{"user_id": "u1"}, {"is_active": False}]})
+
+    def test_unsupported_operator(self):
+        with pytest.raises(ValueError):
+            matches(SESSION, {"user_id": {"$regex": "u"}})
+
+class TestApplyUpdate:
+    def test_set_unset_inc(self):
+        document = {"a": 1, "counts": {"x": 1}}
+        assert apply_update(document, {"$set": {"b.c": 2}, "$unset": {"a": ""}, "$inc": {"counts.x": 2, "counts.y": 1}})
+        assert document == {"b": {"c": 2}, "counts": {"x": 3, "y": 1}}
+
+    def test_push_each_and_position(self):
+        document = {"items": ["a", "d"]}
+        apply_update(document, {"$push": {"items": {"$each": ["b", "c"], "$position": 1}}})
+        apply_update(document, {"$push": {"items": "e"}})
+        assert document["items"] == ["a", "b", "c", "d", "e"]
+
+    def test_add_to_set_skips_duplicates(self):
+        document = {"items": ["a"]}
+        apply_update(document, {"$addToSet": {"items": {"$each": ["a", "b", "b"]}}})
+        assert document["items"] == ["a", "b"]
+
+    def test_pull_value_and_condition(self):
+        document = {"ids": ["a", "b", "a"], "insights": [{"type": "tempo"}, {"type": "memory"}]}
+        apply_update(document, {"$pull": {"ids": "a", "insights": {"type": "tempo"}}})
+        assert document == {"ids": ["b"], "insights": [{"type": "memory"}]}
+
+    def test_reports_no_change(self):
+        document = {"a": 1}
+        assert not apply_update(document, {"$set": {"a": 1}})
+
+    def test_set_copies_value(self):
+        value = {"nested": [1]}
+        document = {}
+        apply_update(document, {"$set": {"v": value}})
+        value["nested"].append(2)
+        assert document["v"] == {"nested": [1]}
+
+class TestProject:
+    def test_inclusion_keeps_id(self):
+        assert project(SESSION, {"user_id": 1, "insight_counts.tempo": 1}) == {
+            "_id": "s1", "user_id": "u1", "insight_counts": {"tempo": 2}
+        }
+
+    def test_inclusion_without_id(self):
+        assert project(SESSION, {"user_id": 1, "_id": 0}) == {"user_id": "u1"}
+
+    def test_id_only_is_inclusion(self):
+        assert project(SESSION, {"_id": 1}) == {"_id": "s1"}
+
+    def test_exclusion(self):
+        result = project(SESSION, {"tags": 0, "_id": 0})
+        assert "tags" not in result and "_id" not in result
+        assert result["user_id"] == "u1"
+
+    def test_returns_copy(self):
+        result = project(SESSION, None)
+        result["tags"].append("chopin")
+        assert SESSION["tags"] == ["scales", "bach"]
+
+class TestSortDocuments:
+    def test_mixed_types_follow_bson_order(self):
+        oid = ObjectId()
+        values = [datetime(2024, 1, 1), True, oid, ["a"], {"a": 1}, "b", 2, None]
+        documents = sort_documents([{"v": v} for v in values] + [{}], [("v", 1)])
+        assert [d.get("v", "missing") for d in documents] == [None, "missing", 2, "b", {"a": 1}, ["a"], oid, True, datetime(2024, 1, 1)]
+
+    def test_compound_sort(self):
+        documents = [{"a": 1, "b": 1}, {"a": 2, "b": 1}, {"a": 1, "b": 2}]
+        assert sort_documents(documents, [("a", 1), ("b", -1)]) == [{"a": 1, "b": 2}, {"a": 1, "b": 1}, {"a": 2, "b": 1}]